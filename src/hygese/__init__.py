@@ -1 +1,54 @@
-from .hygese import *
\ No newline at end of file
+import importlib
+
+# The public API is imported on first attribute access (PEP 562), so
+# ``import hygese`` loads neither NumPy nor the HGS library.
+_SUBMODULES = {
+    "AsyncSolver": "aio",
+    "SolutionCache": "cache",
+    "SolverPool": "pool",
+}
+
+__all__ = [
+    "AlgorithmParameters",
+    "AsyncSolver",
+    "CAlgorithmParameters",
+    "C_DBL_MAX",
+    "C_INT_MAX",
+    "CLOCK_IS_CPU_TIME",
+    "CVRPInstance",
+    "CompactRoutingSolution",
+    "CustomerChanges",
+    "FleetSolution",
+    "HGS_LIBRARY_FILEPATH",
+    "MultiDepotSolution",
+    "PortfolioResult",
+    "RoutingSolution",
+    "SolutionCache",
+    "SolveProgress",
+    "Solver",
+    "SolverPool",
+    "TRACE_DTYPE",
+    "VehicleType",
+    "get_lib_filename",
+    "get_lib_path",
+    "load_library",
+]
+
+
+def __getattr__(name):
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_SUBMODULES.get(name, 'hygese')}", __name__)
+    if name in globals():  # e.g. the hygese.hygese submodule itself
+        return globals()[name]
+    try:
+        value = getattr(module, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    if name != "HGS_LIBRARY_FILEPATH":
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,368 @@
+"""Pure-NumPy helpers for evaluating and repairing sets of CVRP routes.
+
+Routes follow the ``RoutingSolution.routes`` convention: lists of customer
+indices that leave the depot (node 0) out.
+"""
+
+import numpy as np
+
+from .distances import distance_matrix, round_half_up
+
+
+def euclidean_matrix(x_coords, y_coords, rounding):
+    """Distance matrix HGS builds internally from coordinates."""
+    return distance_matrix(x_coords, y_coords, "rounded_euclidean" if rounding else "euclidean")
+
+
+def route_distance(route, dist_mtx):
+    path = np.concatenate(([0], np.asarray(route, dtype=np.int64), [0]))
+    return float(dist_mtx[path[:-1], path[1:]].sum())
+
+
+def route_distance_xy(route, x_coords, y_coords, rounding):
+    """``route_distance`` from coordinates, with HGS's optional rounding."""
+    path = np.concatenate(([0], np.asarray(route, dtype=np.int64), [0]))
+    legs = np.hypot(np.diff(x_coords[path]), np.diff(y_coords[path]))
+    return float((round_half_up(legs) if rounding else legs).sum())
+
+
+def polar_angles(x_coords, y_coords):
+    """Angle of every node around the depot, in (-pi, pi]."""
+    x = np.asarray(x_coords, dtype=np.float64)
+    y = np.asarray(y_coords, dtype=np.float64)
+    return np.arctan2(y - y[0], x - x[0])
+
+
+def repair_routes(
+    routes,
+    metric,
+    demand,
+    vehicle_capacity,
+    max_vehicles,
+    service_times,
+    duration_limit=None,
+):
+    """Turn ``routes`` into a feasible solution of the given instance.
+
+    Unknown, duplicate and depot entries are dropped, then every customer not
+    yet visited is inserted at its cheapest feasible position, opening a new
+    route when no existing one has room. Distances come from ``metric``, a
+    ``TourMetric``, so coordinate instances need no distance matrix. Returns
+    the repaired list of routes, or None if the greedy insertion cannot
+    respect capacity, duration and fleet size.
+    """
+    n_nodes = len(demand)
+    seen = np.zeros(n_nodes, dtype=bool)
+    seen[0] = True
+    repaired = []
+    for route in routes:
+        kept = []
+        for node in route:
+            node = int(node)
+            if 0 < node < n_nodes and not seen[node]:
+                seen[node] = True
+                kept.append(node)
+        if kept:
+            repaired.append(kept)
+
+    if len(repaired) > max_vehicles:
+        return None
+    loads = [float(demand[r].sum()) for r in repaired]
+    durations = [metric.route_cost(r) + float(service_times[r].sum()) for r in repaired]
+    if any(load > vehicle_capacity for load in loads):
+        return None
+    if duration_limit is not None and any(d > duration_limit for d in durations):
+        return None
+
+    # Largest demands first, while the most room is left.
+    missing = np.flatnonzero(~seen)
+    missing = missing[np.argsort(-np.asarray(demand)[missing], kind="stable")]
+    for node in missing:
+        node = int(node)
+        best = None  # (delta, route index, position)
+        for k, route in enumerate(repaired):
+            if loads[k] + demand[node] > vehicle_capacity:
+                continue
+            path = np.concatenate(([0], route, [0]))
+            prev, succ = path[:-1], path[1:]
+            delta = metric.pairs(prev, node) + metric.pairs(node, succ) - metric.pairs(prev, succ)
+            if duration_limit is not None:
+                room = duration_limit - durations[k] - service_times[node]
+                delta = np.where(delta <= room, delta, np.inf)
+            pos = int(np.argmin(delta))
+            if np.isfinite(delta[pos]) and (best is None or delta[pos] < best[0]):
+                best = (float(delta[pos]), k, pos)
+
+        if best is not None:
+            delta, k, pos = best
+            repaired[k].insert(pos, node)
+            loads[k] += float(demand[node])
+            durations[k] += delta + float(service_times[node])
+            continue
+
+        duration = metric.route_cost([node]) + service_times[node]
+        if len(repaired) >= max_vehicles or demand[node] > vehicle_capacity:
+            return None
+        if duration_limit is not None and duration > duration_limit:
+            return None
+        repaired.append([node])
+        loads.append(float(demand[node]))
+        durations.append(float(duration))
+
+    return repaired
+
+
+class TourMetric:
+    """Distance lookups for route repair and tour polishing, from a matrix or
+    from coordinates (Euclidean, optionally rounded like HGS)."""
+
+    def __init__(self, dist_mtx=None, x_coords=None, y_coords=None, rounding=False):
+        self.dist_mtx = dist_mtx
+        self.x = x_coords
+        self.y = y_coords
+        self.rounding = rounding
+        self.n_nodes = len(dist_mtx) if dist_mtx is not None else len(x_coords)
+
+    def pairs(self, a, b):
+        """Elementwise distances between nodes ``a`` and ``b``."""
+        if self.dist_mtx is not None:
+            return self.dist_mtx[a, b]
+        d = np.hypot(self.x[a] - self.x[b], self.y[a] - self.y[b])
+        return round_half_up(d, out=d) if self.rounding else d
+
+    def route_cost(self, route):
+        """Length of ``route``, a list of customers, from and back to the
+        depot."""
+        path = np.concatenate(([0], np.asarray(route, dtype=np.int64), [0]))
+        return float(self.pairs(path[:-1], path[1:]).sum())
+
+    def legs(self, tour):
+        """``legs[k]`` is the length of edge tour[k] -> tour[k + 1], the last
+        one closing the tour."""
+        return self.pairs(tour, np.roll(tour, -1))
+
+    def neighbors(self, k, block_rows=256):
+        """n x k array of the ``k`` nearest other nodes of every node."""
+        n = self.n_nodes
+        k = min(k, n - 1)
+        out = np.empty((n, k), dtype=np.int64)
+        for start in range(0, n, block_rows):
+            rows = np.arange(start, min(start + block_rows, n))
+            if self.dist_mtx is not None:
+                d = np.array(self.dist_mtx[rows], dtype=np.float64)
+            else:
+                d = np.hypot(self.x[rows, None] - self.x, self.y[rows, None] - self.y)
+            d[np.arange(rows.size), rows] = np.inf
+            out[rows] = np.argpartition(d, k - 1, axis=1)[:, :k]
+        return out
+
+
+def polish_tour(tour, metric, n_neighbors=10, max_rounds=1000, eps=1e-9):
+    """Improve a closed tour with 2-opt and Or-opt moves.
+
+    ``tour`` starts at the depot, which stays in front. Candidate moves link
+    a node to one of its ``n_neighbors`` nearest nodes; each round prices all
+    of them at once with NumPy, then applies the improving ones in order of
+    gain, skipping any that overlap a tour stretch already changed in the
+    round. Or-opt moves segments of 1-3 nodes, in either orientation.
+    Distances must be symmetric. Returns the polished tour.
+    """
+    tour = np.array(tour, dtype=np.int64)
+    m = tour.size
+    if m < 5:
+        return tour
+    neighbors = metric.neighbors(n_neighbors)
+    positions = np.arange(m)
+
+    for _ in range(max_rounds):
+        pos = np.empty(m, dtype=np.int64)
+        pos[tour] = positions
+        legs = metric.legs(tour)
+        succ = np.roll(tour, -1)
+        moves = []  # (delta, first, last, kind, args)
+
+        # 2-opt: edges (a, b), (c, d) become (a, c), (b, d).
+        a, b = tour[:, None], succ[:, None]
+        c = neighbors[tour]
+        j = pos[c]
+        delta = metric.pairs(a, c) + metric.pairs(b, succ[j]) - legs[:, None] - legs[j]
+        for i, k in zip(*np.nonzero(delta < -eps)):
+            lo, hi = sorted((int(i), int(j[i, k])))
+            moves.append((delta[i, k], lo, hi + 1, "2opt", (lo, hi)))
+
+        # Or-opt: tour[s:s + length] moves between c and its successor d,
+        # as c -> first ... last -> d, or reversed next to a neighbour of last.
+        for length in (1, 2, 3):
+            s = np.arange(1, m - length + 1)
+            first, last = tour[s], tour[s + length - 1]
+            prev, nxt = tour[s - 1], tour[(s + length) % m]
+            gain = metric.pairs(prev, first) + metric.pairs(last, nxt) - metric.pairs(prev, nxt)
+            for reverse, near, far in ((False, first, last), (True, last, first)):
+                c = neighbors[near]
+                pc = pos[c]
+                cost = metric.pairs(near[:, None], c) + metric.pairs(far[:, None], succ[pc]) - legs[pc]
+                cost[(pc >= s[:, None] - 1) & (pc <= s[:, None] + length - 1)] = np.inf
+                delta = cost - gain[:, None]
+                for i, k in zip(*np.nonzero(delta < -eps)):
+                    start, target = int(s[i]), int(pc[i, k])
+                    lo, hi = (start - 1, target + 1) if target > start else (target, start + length)
+                    moves.append((delta[i, k], lo, hi, "oropt", (start, length, target, reverse)))
+
+        if not moves:
+            break
+        moves.sort(key=lambda move: move[0])
+        changed = np.zeros(m + 1, dtype=bool)
+        for _, lo, hi, kind, args in moves:
+            if changed[lo : hi + 1].any():
+                continue
+            changed[lo : hi + 1] = True
+            if kind == "2opt":
+                lo_, hi_ = args
+                tour[lo_ + 1 : hi_ + 1] = tour[lo_ + 1 : hi_ + 1][::-1].copy()
+            else:
+                start, length, target, reverse = args
+                piece = tour[start : start + length].copy()
+                if reverse:
+                    piece = piece[::-1]
+                if target > start:
+                    tour[start : target + 1] = np.concatenate(
+                        (tour[start + length : target + 1], piece)
+                    )
+                else:
+                    tour[target + 1 : start + length] = np.concatenate(
+                        (piece, tour[target + 1 : start])
+                    )
+    return tour
+
+
+def assign_depots(depot_dist, demand, capacities=None):
+    """Index into the depots for every node, given the (n_depots, n_nodes)
+    distances ``depot_dist``.
+
+    Without ``capacities`` each node goes to its nearest depot. Otherwise
+    nodes are taken by decreasing regret (distance to the second-nearest
+    depot minus the nearest) and get the nearest depot whose total demand
+    stays within its capacity. Raises ``ValueError`` if a node fits nowhere.
+    """
+    order = np.argsort(depot_dist, axis=0, kind="stable")
+    if capacities is None:
+        return order[0]
+
+    room = np.array(capacities, dtype=np.float64)
+    nearest = np.take_along_axis(depot_dist, order, axis=0)
+    regret = nearest[1] - nearest[0] if len(room) > 1 else np.zeros(depot_dist.shape[1])
+    assigned = np.empty(depot_dist.shape[1], dtype=np.int64)
+    for node in np.argsort(-regret, kind="stable"):
+        for d in order[:, node]:
+            if demand[node] <= room[d]:
+                room[d] -= demand[node]
+                assigned[node] = d
+                break
+        else:
+            raise ValueError("The depot capacities cannot hold every customer's demand.")
+    return assigned
+
+
+def cross_depot_moves(
+    routes,
+    route_depots,
+    metric,
+    demand,
+    service_times,
+    vehicle_capacity,
+    duration_limit=None,
+    depot_room=None,
+    eps=1e-9,
+):
+    """One round of moving customers into routes of other depots.
+
+    Every customer is priced at its cheapest feasible insertion into a route
+    of another depot (capacity, ``duration_limit`` and the remaining depot
+    capacity ``depot_room``, a dict by depot node, are respected) against
+    the saving of removing it from its own route. Improving moves are
+    applied best first, touching each route at most once. ``routes`` (lists
+    of nodes, depots left out) are modified in place and emptied routes
+    dropped; returns ``(routes, route_depots, moved)``.
+    """
+    paths = [np.concatenate(([d], r, [d])).astype(np.int64) for r, d in zip(routes, route_depots)]
+    if not paths:
+        return routes, route_depots, 0
+    head = np.concatenate([p[:-1] for p in paths])
+    tail = np.concatenate([p[1:] for p in paths])
+    edge_route = np.repeat(np.arange(len(paths)), [len(p) - 1 for p in paths])
+    edge_depot = np.asarray(route_depots, dtype=np.int64)[edge_route]
+    edge_pos = np.concatenate([np.arange(len(p) - 1) for p in paths])
+    base = metric.pairs(head, tail)
+
+    loads = np.array([demand[r].sum() for r in routes], dtype=np.float64)
+    legs = np.split(base, np.cumsum([len(p) - 1 for p in paths])[:-1])
+    durations = np.array(
+        [leg.sum() + service_times[r].sum() for leg, r in zip(legs, routes)], dtype=np.float64
+    )
+
+    if depot_room is not None:
+        route_room = np.array([depot_room[d] for d in route_depots], dtype=np.float64)
+
+    candidates = []  # (gain, route, position, target route, target position)
+    for k, path in enumerate(paths):
+        nodes = path[1:-1]
+        gains = (
+            metric.pairs(path[:-2], nodes)
+            + metric.pairs(nodes, path[2:])
+            - metric.pairs(path[:-2], path[2:])
+        )
+        for i, node in enumerate(nodes):
+            delta = metric.pairs(head, node) + metric.pairs(node, tail) - base
+            feasible = (edge_depot != route_depots[k]) & (
+                loads[edge_route] + demand[node] <= vehicle_capacity
+            )
+            if duration_limit is not None:
+                feasible &= durations[edge_route] + delta + service_times[node] <= duration_limit
+            if depot_room is not None:
+                feasible &= demand[node] <= route_room[edge_route]
+            delta = np.where(feasible, delta, np.inf)
+            e = int(np.argmin(delta))
+            if gains[i] - delta[e] > eps:
+                candidates.append((gains[i] - delta[e], k, i, int(edge_route[e]), int(edge_pos[e])))
+
+    touched = np.zeros(len(paths), dtype=bool)
+    moved = 0
+    inserts = []
+    for gain, k, i, target, pos in sorted(candidates, key=lambda c: -c[0]):
+        if touched[k] or touched[target]:
+            continue
+        node = int(paths[k][i + 1])
+        if depot_room is not None:
+            if demand[node] > depot_room[route_depots[target]]:
+                continue
+            depot_room[route_depots[target]] -= demand[node]
+            depot_room[route_depots[k]] += demand[node]
+        touched[k] = touched[target] = True
+        routes[k] = [v for j, v in enumerate(routes[k]) if j != i]
+        inserts.append((target, pos, node))
+        moved += 1
+    for target, pos, node in inserts:
+        routes[target] = list(routes[target][:pos]) + [node] + list(routes[target][pos:])
+
+    kept = [k for k, r in enumerate(routes) if len(r)]
+    return [routes[k] for k in kept], [route_depots[k] for k in kept], moved
+
+
+def assign_vehicle_types(loads, capacities, counts, fixed_costs):
+    """Vehicle type of every route, taking routes by decreasing load and
+    giving each the cheapest type (then the smallest) that holds it and has a
+    vehicle left in ``counts`` (which may be ``inf``).
+
+    Returns ``(types, counts_left)``; ``types`` is -1 for routes left without
+    a vehicle.
+    """
+    left = np.array(counts, dtype=np.float64)
+    by_cost = np.lexsort((capacities, fixed_costs))
+    types = np.full(len(loads), -1, dtype=np.int64)
+    for r in np.argsort(-np.asarray(loads), kind="stable"):
+        for t in by_cost:
+            if capacities[t] >= loads[r] and left[t] >= 1:
+                types[r] = t
+                left[t] -= 1
+                break
+    return types, left
@@ -0,0 +1,67 @@
+"""Dense distance matrices from sparse or nearest-neighbour distance input.
+
+HGS only reads a dense n x n matrix, so sparse input is expanded into one
+float64 buffer: missing pairs are filled block by block from a fallback,
+then the known distances are scattered on top. No other n x n temporaries
+are created.
+"""
+
+import numpy as np
+
+from .distances import distance_matrix
+
+# Rows filled per call to a callable fallback; bounds its temporaries.
+_BLOCK_ROWS = 512
+
+
+def has_sparse_distances(data):
+    dist_mtx = data.get("distance_matrix")
+    return "neighbor_indices" in data or (dist_mtx is not None and hasattr(dist_mtx, "tocoo"))
+
+
+def sparse_distance_matrix(data, n_nodes, x_coords, y_coords, rounding):
+    """Dense distance matrix for a ``data`` dict with sparse distances.
+
+    Known distances come either from ``data["distance_matrix"]`` given as a
+    ``scipy.sparse`` matrix (explicit entries only) or from the n x k arrays
+    ``data["neighbor_indices"]`` / ``data["neighbor_distances"]``, where row i
+    lists the k neighbours of node i and their distances.
+
+    Other pairs take ``data["missing_distance"]``: a scalar, or a callable
+    ``f(i, j)`` receiving broadcastable index arrays and returning the
+    corresponding distances. Without it, Euclidean distances between the
+    coordinates are used (rounded if ``rounding``).
+    """
+    if "neighbor_indices" in data:
+        cols = np.asarray(data["neighbor_indices"], dtype=np.int64)
+        values = np.asarray(data["neighbor_distances"], dtype=np.float64)
+        if cols.shape != values.shape or cols.shape[0] != n_nodes:
+            raise ValueError("neighbor_indices and neighbor_distances must both be n x k arrays.")
+        rows = np.broadcast_to(np.arange(n_nodes)[:, None], cols.shape)
+    else:
+        coo = data["distance_matrix"].tocoo()
+        if coo.shape != (n_nodes, n_nodes):
+            raise ValueError("The sparse distance_matrix must be n x n.")
+        rows, cols, values = coo.row, coo.col, np.asarray(coo.data, dtype=np.float64)
+
+    missing = data.get("missing_distance")
+    dist = np.empty((n_nodes, n_nodes), dtype=np.float64)
+    if missing is None:
+        if x_coords is None or y_coords is None:
+            raise ValueError(
+                "Sparse distances need coordinates or a missing_distance fallback."
+            )
+        metric = "rounded_euclidean" if rounding else "euclidean"
+        distance_matrix(x_coords, y_coords, metric, out=dist)
+    elif callable(missing):
+        j = np.arange(n_nodes)[None, :]
+        for start in range(0, n_nodes, _BLOCK_ROWS):
+            stop = min(start + _BLOCK_ROWS, n_nodes)
+            dist[start:stop] = missing(np.arange(start, stop)[:, None], j)
+    else:
+        dist.fill(missing)
+
+    dist[rows, cols] = values
+    np.fill_diagonal(dist, 0.0)
+    return dist
+
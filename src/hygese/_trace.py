@@ -0,0 +1,131 @@
+"""Convergence traces parsed from the HGS verbose output.
+
+HGS only reports its search progress by printing a line every
+``nbIterTraces`` iterations to the C ``stdout``. ``capture_stdout`` points
+file descriptor 1 at a temporary file for the duration of a native call and
+``parse_trace`` turns the captured lines into a NumPy structured array of
+``TRACE_DTYPE``. Whatever else the process printed meanwhile is given back
+by ``other_output``.
+"""
+
+import ctypes
+import os
+import re
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+TRACE_DTYPE = np.dtype(
+    [
+        ("iteration", np.int64),
+        ("iterations_no_improvement", np.int64),
+        ("time", np.float64),
+        ("feasible_size", np.int64),
+        ("feasible_best", np.float64),
+        ("feasible_average", np.float64),
+        ("infeasible_size", np.int64),
+        ("infeasible_best", np.float64),
+        ("infeasible_average", np.float64),
+        ("feasible_diversity", np.float64),
+        ("infeasible_diversity", np.float64),
+        ("load_feasible_fraction", np.float64),
+        ("duration_feasible_fraction", np.float64),
+        ("capacity_penalty", np.float64),
+        ("duration_penalty", np.float64),
+    ]
+)
+
+# It  <it> <nonprod> | T(s) <t> | Feas <n> <best> <avg> | Inf <n> <best> <avg>
+#   | Div <feas> <inf> | Feas <load> <duration> | Pen <capacity> <duration>
+# with "NO-FEASIBLE" / "NO-INFEASIBLE" for an empty subpopulation.
+_LINE = re.compile(
+    r"^It\s+(\d+)\s+(\d+) \| T\(s\) (\S+)"
+    r" \| (?:Feas (\d+) (\S+) (\S+)|NO-FEASIBLE)"
+    r" \| (?:Inf (\d+) (\S+) (\S+)|NO-INFEASIBLE)"
+    r" \| Div (\S+) (\S+) \| Feas (\S+) (\S+) \| Pen (\S+) (\S+)",
+    re.MULTILINE,
+)
+_FINISHED = re.compile(r"FINISHED AFTER (\d+) ITERATIONS")
+# Every line HGS prints is a trace line or starts with "-----".
+_HGS_LINE = re.compile(r"^(?:-----|It\s+\d)")
+
+# File descriptor 1 is shared by the whole process, so captures run one at a
+# time.
+_CAPTURE_LOCK = threading.Lock()
+
+
+def _c_fflush():
+    # Flush the C runtime's stdout buffer, which Python's sys.stdout bypasses.
+    if os.name == "nt":
+        libc = ctypes.CDLL("ucrtbase")
+    else:
+        libc = ctypes.CDLL(None)
+    libc.fflush(None)
+
+
+@contextmanager
+def capture_stdout():
+    """Redirect file descriptor 1 to a temporary file; the yielded list
+    receives the captured text on exit.
+
+    Anything else the process writes to stdout meanwhile is captured too
+    (see ``other_output``), and concurrent captures wait for each other.
+    """
+    captured = []
+    with _CAPTURE_LOCK:
+        sys.stdout.flush()
+        _c_fflush()
+        saved = os.dup(1)
+        with tempfile.TemporaryFile() as tmp:
+            os.dup2(tmp.fileno(), 1)
+            try:
+                yield captured
+            finally:
+                _c_fflush()
+                os.dup2(saved, 1)
+                os.close(saved)
+                tmp.seek(0)
+                captured.append(tmp.read().decode(errors="replace"))
+
+
+def _row(g):
+    return (
+        int(g[0]),
+        int(g[1]),
+        float(g[2]),
+        int(g[3]) if g[3] is not None else 0,
+        float(g[4]) if g[4] is not None else np.nan,
+        float(g[5]) if g[5] is not None else np.nan,
+        int(g[6]) if g[6] is not None else 0,
+        float(g[7]) if g[7] is not None else np.nan,
+        float(g[8]) if g[8] is not None else np.nan,
+        *(float(v) for v in g[9:]),
+    )
+
+
+def parse_line(line):
+    """One HGS trace line as a tuple of ``TRACE_DTYPE`` fields, or None if
+    ``line`` is not a trace line."""
+    m = _LINE.match(line)
+    return None if m is None else _row(m.groups())
+
+
+def parse_trace(text):
+    """``(trace, iterations)``: the trace lines of ``text`` as a
+    ``TRACE_DTYPE`` array, and the total iteration count HGS reported at the
+    end of the run (None if missing)."""
+    rows = [_row(m.groups()) for m in _LINE.finditer(text)]
+    finished = _FINISHED.search(text)
+    iterations = int(finished.group(1)) if finished else None
+    return np.array(rows, dtype=TRACE_DTYPE), iterations
+
+
+def other_output(text):
+    """The lines of captured ``text`` that HGS did not print, e.g. output of
+    other threads during the capture."""
+    return "".join(
+        line for line in text.splitlines(keepends=True) if not _HGS_LINE.match(line)
+    )
@@ -0,0 +1,111 @@
+"""asyncio interface to the HGS solver.
+
+Each solve runs in its own child process, so awaiting it never blocks the
+event loop and cancelling it actually stops the native HGS run.
+"""
+
+import asyncio
+import contextlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .hygese import AlgorithmParameters, Solver, _process_context
+
+
+def _solve_in_child(conn, parameters, verbose, solution_format, method, data, rounding):
+    try:
+        solver = Solver(parameters, verbose, solution_format=solution_format)
+        conn.send((True, getattr(solver, method)(data, rounding=rounding)))
+    except Exception as exc:
+        conn.send((False, exc))
+    finally:
+        conn.close()
+
+
+def _wait_for_child(conn, process, poll_interval):
+    # Polling instead of a blocking recv() lets a terminated child end the
+    # wait even when its pipe was inherited by another forked child.
+    while True:
+        if conn.poll(poll_interval):
+            return conn.recv()
+        if not process.is_alive() and not conn.poll():
+            raise RuntimeError(f"HGS solver process exited with code {process.exitcode}.")
+
+
+class AsyncSolver:
+    """Awaitable counterpart of ``Solver``.
+
+    At most ``max_concurrency`` solves run at once (default: CPU count);
+    further calls wait their turn without blocking the event loop. The child
+    processes come from ``mp_context``, by default a fork server (spawned
+    on Windows): forking the event loop's process, which runs the
+    executor's threads, could deadlock the child.
+    """
+
+    def __init__(
+        self,
+        parameters=AlgorithmParameters(),
+        verbose=False,
+        solution_format="list",
+        max_concurrency=None,
+        mp_context=None,
+        poll_interval=0.05,
+    ):
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        self.algorithm_parameters = parameters
+        self.verbose = verbose
+        self.solution_format = solution_format
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self._context = mp_context or _process_context()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    async def solve_cvrp(self, data, rounding=True):
+        return await self._solve("solve_cvrp", data, rounding)
+
+    async def solve_tsp(self, data, rounding=True):
+        return await self._solve("solve_tsp", data, rounding)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def _solve(self, method, data, rounding):
+        async with self._semaphore:
+            parent, child = self._context.Pipe(duplex=False)
+            process = self._context.Process(
+                target=_solve_in_child,
+                args=(
+                    child,
+                    self.algorithm_parameters,
+                    self.verbose,
+                    self.solution_format,
+                    method,
+                    data,
+                    rounding,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+
+            loop = asyncio.get_running_loop()
+            wait = loop.run_in_executor(
+                self._executor, _wait_for_child, parent, process, self.poll_interval
+            )
+            try:
+                ok, payload = await asyncio.shield(wait)
+            except asyncio.CancelledError:
+                process.terminate()
+                with contextlib.suppress(Exception):
+                    await wait
+                raise
+            finally:
+                # the child has exited or been terminated; reap it off the loop
+                await loop.run_in_executor(self._executor, process.join)
+                parent.close()
+
+        if not ok:
+            raise payload
+        return payload
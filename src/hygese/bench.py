@@ -0,0 +1,325 @@
+"""Benchmark hygese on CVRPLIB instances.
+
+Runs ``Solver.solve_cvrp`` with fixed seeds and budgets and reports, per run,
+the cost, gap to the best-known solution, time to reach a target gap and the
+wrapper overhead (wall-clock time minus the time HGS reports), as JSON or
+CSV::
+
+    python -m hygese.bench --time-limit 1 --seeds 0 1 2 --format csv
+
+Without instance paths, the small set bundled in ``hygese/instances`` is
+used. Paths may be ``.vrp`` files, directories or tar archives of them; they
+are read one instance at a time by ``hygese.io``.
+
+``--tsp`` instead compares ``Solver.solve_tsp`` with solving the same random
+uniform TSPs as single-vehicle CVRPs through ``solve_cvrp``::
+
+    python -m hygese.bench --tsp 1000 2000 5000 --time-limit 10
+
+``--overhead`` times the per-call wrapper overhead of ``solve_cvrp`` and
+``solve_cvrp_into`` on tiny instances::
+
+    python -m hygese.bench --overhead 10 20 50 --format csv
+
+``--startup`` times, in fresh interpreters, ``import hygese`` and the first
+solve, which loads NumPy and the HGS library::
+
+    python -m hygese.bench --startup 5
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from .hygese import AlgorithmParameters, Solver
+from .io import iter_instances, read_instance
+
+INSTANCES_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "instances")
+
+FIELDS = [
+    "instance",
+    "n_nodes",
+    "seed",
+    "cost",
+    "best_known",
+    "gap",
+    "time_to_target",
+    "native_time",
+    "wall_time",
+    "overhead",
+]
+
+
+def bundled_instances():
+    return sorted(
+        os.path.join(INSTANCES_DIR, f) for f in os.listdir(INSTANCES_DIR) if f.endswith(".vrp")
+    )
+
+
+def read_cvrplib(path):
+    """Read a CVRPLIB file; returns ``(name, data, rounding, best_known)``.
+    See ``hygese.io.read_instance`` for the supported formats."""
+    instance = read_instance(path)
+    return instance.name, instance.data, instance.rounding, instance.best_known
+
+
+def run_benchmark(paths=None, seeds=(0,), parameters=None, target_gap=1.0):
+    """Solve every instance once per seed; return one record dict per run.
+
+    ``parameters`` (default ``AlgorithmParameters()``) sets the budget; only
+    its seed is overridden. ``time_to_target`` is the HGS time at which the
+    best feasible cost first came within ``target_gap`` percent, read from
+    the convergence trace (so to within ``nbIterTraces`` iterations), or None
+    if the run never got there.
+    """
+    if parameters is None:
+        parameters = AlgorithmParameters()
+
+    records = []
+    for instance in _load(paths):
+        best_known = instance.best_known
+        for seed in seeds:
+            solver = Solver(replace(parameters, seed=seed), verbose=False, trace=True)
+
+            start = time.perf_counter()
+            result = solver.solve_cvrp(instance.data, rounding=instance.rounding)
+            wall_time = time.perf_counter() - start
+
+            gap = None
+            time_to_target = None
+            if best_known:
+                gap = 100.0 * (result.cost - best_known) / best_known
+                if gap <= target_gap:
+                    target = best_known * (1.0 + target_gap / 100.0)
+                    reached = np.flatnonzero(result.trace["feasible_best"] <= target)
+                    time_to_target = result.time
+                    if reached.size:
+                        time_to_target = float(result.trace["time"][reached[0]])
+            records.append(
+                {
+                    "instance": instance.name,
+                    "n_nodes": int(instance.specs["DIMENSION"]),
+                    "seed": seed,
+                    "cost": result.cost,
+                    "best_known": best_known,
+                    "gap": gap,
+                    "time_to_target": time_to_target,
+                    "native_time": result.time,
+                    "wall_time": wall_time,
+                    "overhead": wall_time - result.time,
+                }
+            )
+    return records
+
+
+def run_tsp_benchmark(sizes=(1000, 2000, 5000, 10000), seeds=(0,), parameters=None):
+    """Solve a random uniform TSP of each size per seed, once as a
+    single-vehicle CVRP (``path="cvrp"``) and once with ``solve_tsp``
+    (``path="tsp"``); return one record dict per run."""
+    if parameters is None:
+        parameters = AlgorithmParameters()
+
+    records = []
+    for n in sizes:
+        for seed in seeds:
+            rng = np.random.default_rng(seed)
+            data = {
+                "x_coordinates": rng.uniform(0, 10000, n),
+                "y_coordinates": rng.uniform(0, 10000, n),
+            }
+            cvrp = dict(data, num_vehicles=1, demands=np.ones(n), vehicle_capacity=n)
+            solver = Solver(replace(parameters, seed=seed), verbose=False)
+            for path, solve in (
+                ("cvrp", lambda: solver.solve_cvrp(cvrp)),
+                ("tsp", lambda: solver.solve_tsp(data)),
+            ):
+                start = time.perf_counter()
+                result = solve()
+                wall_time = time.perf_counter() - start
+                records.append(
+                    {
+                        "instance": f"tsp-uniform-{n}",
+                        "n_nodes": n,
+                        "seed": seed,
+                        "path": path,
+                        "cost": result.cost,
+                        "native_time": result.time,
+                        "wall_time": wall_time,
+                        "overhead": wall_time - result.time,
+                    }
+                )
+    return records
+
+
+# Shortest HGS run: the overhead benchmark times the wrapper, not the search.
+OVERHEAD_PARAMETERS = AlgorithmParameters(mu=4, lambda_=4, nbElite=1, nbClose=1, nbIter=1)
+
+
+def run_overhead_benchmark(sizes=(10, 20, 50), calls=1000, parameters=OVERHEAD_PARAMETERS):
+    """Time ``calls`` solves of a random uniform CVRP of each size through
+    ``solve_cvrp`` (``path="solve_cvrp"``) and ``solve_cvrp_into``
+    (``path="solve_cvrp_into"``), alternating between the two; return one
+    record per path with median per-call times. ``native_time`` is the time
+    spent in the C call and ``overhead`` the rest of the call."""
+    records = []
+    for n in sizes:
+        rng = np.random.default_rng(n)
+        data = {
+            "x_coordinates": rng.uniform(0, 1000, n),
+            "y_coordinates": rng.uniform(0, 1000, n),
+            "demands": np.r_[0, rng.integers(1, 10, n - 1)].astype(np.float64),
+            "vehicle_capacity": 30,
+        }
+        solver = Solver(parameters, verbose=False)
+        c_solve = solver._c_api_solve_cvrp
+        native = []
+
+        def timed_c_solve(*args):
+            start = time.perf_counter()
+            sol = c_solve(*args)
+            native.append(time.perf_counter() - start)
+            return sol
+
+        solver._c_api_solve_cvrp = timed_c_solve
+        out = np.empty(2 * n, dtype=np.int32)
+        paths = {
+            "solve_cvrp": lambda: solver.solve_cvrp(data),
+            "solve_cvrp_into": lambda: solver.solve_cvrp_into(**data, out=out),
+        }
+        times = {path: np.empty((calls, 2)) for path in paths}
+        for k in range(calls):
+            for path, solve in paths.items():
+                start = time.perf_counter()
+                solve()
+                times[path][k] = time.perf_counter() - start, native.pop()
+
+        for path, t in times.items():
+            records.append(
+                {
+                    "instance": f"cvrp-uniform-{n}",
+                    "n_nodes": n,
+                    "path": path,
+                    "calls": calls,
+                    "native_time": float(np.median(t[:, 1])),
+                    "wall_time": float(np.median(t[:, 0])),
+                    "overhead": float(np.median(t[:, 0] - t[:, 1])),
+                }
+            )
+    return records
+
+
+_STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import hygese
+imported = time.perf_counter()
+from hygese.bench import OVERHEAD_PARAMETERS
+data = dict(x_coordinates=[0, 1, 2, 3], y_coordinates=[0, 3, 1, 2],
+            demands=[0, 1, 1, 1], vehicle_capacity=2)
+solver = hygese.Solver(OVERHEAD_PARAMETERS, verbose=False)
+result = solver.solve_cvrp(data)
+first = time.perf_counter()
+solver.solve_cvrp(data)
+second = time.perf_counter()
+json.dump({"import_time": imported - start, "first_solve_time": first - imported,
+           "second_solve_time": second - first, "native_time": result.time}, sys.stdout)
+"""
+
+
+def run_startup_benchmark(runs=5):
+    """Time ``import hygese``, the first solve (which imports NumPy and loads
+    the HGS library) and a second solve, each run in a fresh interpreter;
+    return one record per run."""
+    package_root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    records = []
+    for run in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        records.append({"run": run, **json.loads(out)})
+    return records
+
+
+def format_records(records, fmt="json"):
+    if fmt == "json":
+        return json.dumps(records, indent=2)
+    if fmt == "csv":
+        out = io.StringIO()
+        fields = list(records[0]) if records else FIELDS
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
+        return out.getvalue()
+    raise ValueError(f"Unknown format {fmt!r}; use 'json' or 'csv'.")
+
+
+def _load(paths):
+    """Lazily read the instances under ``paths`` (files, directories or tar
+    archives), or the bundled set."""
+    for path in paths or bundled_instances():
+        yield from iter_instances(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m hygese.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help=".vrp files, directories or tar archives (default: bundled set)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--time-limit", type=float, default=0.0, help="HGS timeLimit in seconds")
+    parser.add_argument("--nb-iter", type=int, default=AlgorithmParameters.nbIter)
+    parser.add_argument("--target-gap", type=float, default=1.0, help="target gap in percent")
+    parser.add_argument(
+        "--tsp", type=int, nargs="+", metavar="N", help="run the TSP comparison on these sizes instead"
+    )
+    parser.add_argument(
+        "--overhead",
+        type=int,
+        nargs="+",
+        metavar="N",
+        help="time the per-call wrapper overhead on these sizes instead",
+    )
+    parser.add_argument(
+        "--startup",
+        type=int,
+        metavar="RUNS",
+        help="time the package import and first solve in this many fresh interpreters instead",
+    )
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", help="write the report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    ap = AlgorithmParameters(timeLimit=args.time_limit, nbIter=args.nb_iter)
+    if args.startup:
+        records = run_startup_benchmark(args.startup)
+    elif args.overhead:
+        records = run_overhead_benchmark(args.overhead)
+    elif args.tsp:
+        records = run_tsp_benchmark(args.tsp, seeds=args.seeds, parameters=ap)
+    else:
+        records = run_benchmark(
+            args.paths, seeds=args.seeds, parameters=ap, target_gap=args.target_gap
+        )
+    report = format_records(records, args.format)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report + ("" if report.endswith("\n") else "\n"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
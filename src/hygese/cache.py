@@ -0,0 +1,128 @@
+"""Solution cache keyed by an instance fingerprint.
+
+Pass a ``SolutionCache`` to ``Solver(..., cache=...)`` and repeated
+``solve_cvrp`` / ``solve_tsp`` calls on identical inputs return the stored
+solution without running HGS. HGS is only reproducible when it stops on
+``nbIter`` (``timeLimit=0``); with a time limit the cache keeps whichever
+solution the first call found.
+"""
+
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import astuple
+
+import numpy as np
+
+
+def fingerprint(arrays, scalars, parameters=None, incumbent_routes=None):
+    """Hex digest identifying a solve: input arrays (None allowed), scalar
+    options, and optionally ``AlgorithmParameters`` and incumbent routes."""
+    h = hashlib.blake2b(digest_size=20)
+    for a in arrays:
+        if a is None:
+            h.update(b"none")
+            continue
+        a = np.ascontiguousarray(a, dtype=np.float64)
+        h.update(repr(a.shape).encode())
+        h.update(memoryview(a).cast("B"))
+    h.update(repr(tuple(scalars)).encode())
+    if parameters is not None:
+        h.update(repr(astuple(parameters)).encode())
+    if incumbent_routes is not None:
+        h.update(repr([[int(node) for node in route] for route in incumbent_routes]).encode())
+    return h.hexdigest()
+
+
+class SolutionCache:
+    """Thread-safe LRU cache of solutions, optionally backed by a directory.
+
+    At most ``maxsize`` solutions are kept in memory. With ``directory``,
+    every solution is also pickled there, and looked up on a memory miss, so
+    the cache survives restarts and is shared by processes using the same
+    directory; ``max_disk_entries`` bounds the number of files, evicting the
+    least recently written.
+    """
+
+    def __init__(self, maxsize=128, directory=None, max_disk_entries=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return a copy of the cached solution for ``key``, or None."""
+        with self._lock:
+            solution = self._entries.get(key)
+            if solution is not None:
+                self._entries.move_to_end(key)
+        if solution is None and self.directory is not None:
+            solution = self._load(key)
+            if solution is not None:
+                self._remember(key, solution)
+
+        with self._lock:
+            if solution is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(solution)
+
+    def put(self, key, solution):
+        solution = copy.deepcopy(solution)
+        self._remember(key, solution)
+        if self.directory is not None:
+            self._store(key, solution)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.directory is not None:
+            for path in self._disk_files():
+                os.remove(path)
+
+    def _remember(self, key, solution):
+        with self._lock:
+            self._entries[key] = solution
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store(self, key, solution):
+        # Write-then-rename so concurrent readers never see a partial file.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(solution, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+
+        if self.max_disk_entries is not None:
+            files = sorted(self._disk_files(), key=os.path.getmtime)
+            for path in files[: max(0, len(files) - self.max_disk_entries)]:
+                os.remove(path)
+
+    def _disk_files(self):
+        return [
+            os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".pkl")
+        ]
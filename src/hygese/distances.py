@@ -0,0 +1,105 @@
+"""Distance matrices from node coordinates.
+
+``distance_matrix(x, y, metric)`` fills an n x n float64 matrix in row
+blocks, so temporaries stay around ``BLOCK_ELEMENTS`` values whatever n is,
+and can spread the blocks over threads (NumPy releases the GIL). Metrics:
+
+- ``"euclidean"``
+- ``"rounded_euclidean"``: Euclidean rounded to the nearest integer, as HGS
+  computes it for ``solve_cvrp(..., rounding=True)``
+- ``"manhattan"``
+- ``"haversine"``: great-circle distance in metres, with ``x`` the longitude
+  and ``y`` the latitude in degrees
+
+``Solver.solve_cvrp(data, metric=...)`` builds the matrix from the data's
+coordinates with these kernels.
+"""
+
+import numpy as np
+
+METRICS = ("euclidean", "rounded_euclidean", "manhattan", "haversine")
+
+# Target number of matrix entries per block.
+BLOCK_ELEMENTS = 1 << 18
+
+EARTH_RADIUS = 6371008.8  # mean Earth radius in metres
+
+
+def distance_matrix(x, y, metric="euclidean", workers=1, out=None, block_rows=None):
+    """Return the n x n ``metric`` distance matrix between points (x[i], y[i]).
+
+    ``workers`` threads fill disjoint row blocks of ``block_rows`` rows
+    (default: about ``BLOCK_ELEMENTS`` entries per block). ``out`` may be a
+    preallocated C-contiguous float64 n x n array to fill.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; use one of {', '.join(METRICS)}.")
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    if x.shape != y.shape or x.ndim != 1:
+        raise ValueError("x and y must be 1-D arrays of the same length.")
+
+    n = x.size
+    if out is None:
+        out = np.empty((n, n), dtype=np.float64)
+    elif out.shape != (n, n) or out.dtype != np.float64 or not out.flags["C_CONTIGUOUS"]:
+        raise ValueError(f"out must be a C-contiguous float64 {n} x {n} array.")
+    if block_rows is None:
+        block_rows = max(1, BLOCK_ELEMENTS // max(n, 1))
+
+    if metric == "haversine":
+        x, y = np.radians(x), np.radians(y)
+    kernel = _KERNELS[metric]
+    starts = range(0, n, block_rows)
+
+    def fill(start):
+        stop = min(start + block_rows, n)
+        kernel(x, y, start, stop, out[start:stop])
+
+    if workers > 1 and len(starts) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fill, starts))
+    else:
+        for start in starts:
+            fill(start)
+    return out
+
+
+def round_half_up(a, out=None):
+    """Round non-negative distances like C's ``std::round`` (half away from
+    zero), not NumPy's round-half-to-even."""
+    out = np.add(a, 0.5, out=out)
+    return np.floor(out, out=out)
+
+
+def _euclidean(x, y, start, stop, out):
+    np.hypot(x[start:stop, None] - x[None, :], y[start:stop, None] - y[None, :], out=out)
+
+
+def _rounded_euclidean(x, y, start, stop, out):
+    _euclidean(x, y, start, stop, out)
+    round_half_up(out, out=out)
+
+
+def _manhattan(x, y, start, stop, out):
+    np.abs(x[start:stop, None] - x[None, :], out=out)
+    out += np.abs(y[start:stop, None] - y[None, :])
+
+
+def _haversine(lon, lat, start, stop, out):
+    dlat = np.sin((lat[start:stop, None] - lat[None, :]) * 0.5)
+    dlon = np.sin((lon[start:stop, None] - lon[None, :]) * 0.5)
+    h = dlat * dlat + np.cos(lat[start:stop, None]) * np.cos(lat[None, :]) * dlon * dlon
+    np.clip(h, 0.0, 1.0, out=h)
+    np.arcsin(np.sqrt(h, out=h), out=out)
+    out *= 2.0 * EARTH_RADIUS
+
+
+_KERNELS = {
+    "euclidean": _euclidean,
+    "rounded_euclidean": _rounded_euclidean,
+    "manhattan": _manhattan,
+    "haversine": _haversine,
+}
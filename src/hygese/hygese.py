@@ -1,5 +1,4 @@
 import os
-import platform
 from ctypes import (
     Structure,
     CDLL,
@@ -9,34 +8,75 @@ from ctypes import (
     c_char,
     sizeof,
     byref,
+    memmove,
 )
-from dataclasses import dataclass
+import copy
+import threading
+import time
+from dataclasses import dataclass, field, replace
 import numpy as np
 import sys
 
+from ._routes import (
+    TourMetric,
+    assign_depots,
+    assign_vehicle_types,
+    cross_depot_moves,
+    euclidean_matrix,
+    polar_angles,
+    polish_tour,
+    repair_routes,
+    route_distance,
+    route_distance_xy,
+)
+from ._sparse import has_sparse_distances, sparse_distance_matrix
+from ._trace import (
+    TRACE_DTYPE,
+    _c_fflush,
+    capture_stdout,
+    other_output,
+    parse_line,
+    parse_trace,
+)
+from .cache import fingerprint
+from .distances import distance_matrix
+from .metrics import SolveStats
+
 
 def get_lib_filename():
-    if platform.system() == "Linux":
+    if sys.platform.startswith("linux"):
         lib_ext = "so"
-    elif platform.system() == "Darwin":
+    elif sys.platform == "darwin":
         lib_ext = "dylib"
-    elif platform.system() == "Windows":
+    elif sys.platform == "win32":
         lib_ext = "dll"
     else:
         lib_ext = "so"
     return f"libhgscvrp.{lib_ext}"
 
 
-# basedir = os.path.abspath(os.path.dirname(__file__))
-basedir = os.path.dirname(os.path.realpath(__file__, strict=True))
-# os.add_dll_directory(basedir)
-HGS_LIBRARY_FILEPATH = os.path.join(basedir, get_lib_filename())
+def get_lib_path():
+    basedir = os.path.dirname(os.path.realpath(__file__, strict=True))
+    return os.path.join(basedir, get_lib_filename())
+
+
+def __getattr__(name):
+    # The library path is resolved on first use, not at import.
+    if name == "HGS_LIBRARY_FILEPATH":
+        return get_lib_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 c_double_p = POINTER(c_double)
 c_int_p = POINTER(c_int)
 C_INT_MAX = 2 ** (sizeof(c_int) * 8 - 1) - 1
 C_DBL_MAX = sys.float_info.max
 
+# HGS measures timeLimit with the C clock(), which is the CPU time of the
+# whole process except with the MSVC runtime on Windows, where it is wall
+# time since the process started.
+CLOCK_IS_CPU_TIME = sys.platform != "win32"
+
 
 # Must match with AlgorithmParameters.h in HGS-CVRP: https://github.com/vidalt/HGS-CVRP
 class CAlgorithmParameters(Structure):
@@ -75,8 +115,26 @@ class AlgorithmParameters:
     timeLimit: float = 0.0
     useSwapStar: bool = True
 
+    def __setattr__(self, name, value):
+        # A changed field invalidates the struct cached by ``ctypes``.
+        self.__dict__.pop("_ctypes", None)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_ctypes", None)
+        return state
+
     @property
     def ctypes(self) -> CAlgorithmParameters:
+        """The parameters as the C struct HGS reads; built on first use and
+        reused until a field changes."""
+        struct = self.__dict__.get("_ctypes")
+        if struct is None:
+            struct = self.__dict__["_ctypes"] = self._to_ctypes()
+        return struct
+
+    def _to_ctypes(self):
         return CAlgorithmParameters(
             self.nbGranular,
             self.mu,
@@ -108,34 +166,31 @@ class _Solution(Structure):
     ]
 
 
-class RoutingSolution:
-    def __init__(self, sol_ptr):
-        if not sol_ptr:
-            raise TypeError("The solution pointer is null.")
+# The HGS library, loaded by the first solve in the process and shared by
+# every Solver.
+_hgs_library = None
+_hgs_library_lock = threading.Lock()
 
-        self.cost = sol_ptr[0].cost
-        self.time = sol_ptr[0].time
-        self.n_routes = sol_ptr[0].n_routes
-        self.routes = []
-        for i in range(self.n_routes):
-            r = sol_ptr[0].routes[i]
-            path = r.path[0 : r.length]
-            self.routes.append(path)
 
+def load_library():
+    """Load the HGS library and declare its C signatures, once per process.
 
-class Solver:
-    def __init__(self, parameters=AlgorithmParameters(), verbose=True):
-        if platform.system() == "Windows":
-            hgs_library = CDLL(HGS_LIBRARY_FILEPATH, winmode=0)
+    Solvers call this on their first solve; calling it up front moves the
+    load out of the first solve's latency. Thread-safe; later calls return
+    the same ``CDLL``.
+    """
+    global _hgs_library
+    if _hgs_library is not None:
+        return _hgs_library
+    with _hgs_library_lock:
+        if _hgs_library is not None:
+            return _hgs_library
+        if sys.platform == "win32":
+            hgs_library = CDLL(get_lib_path(), winmode=0)
         else:
-            hgs_library = CDLL(HGS_LIBRARY_FILEPATH)
+            hgs_library = CDLL(get_lib_path())
 
-        self.algorithm_parameters = parameters
-        self.verbose = verbose
-
-        # solve_cvrp
-        self._c_api_solve_cvrp = hgs_library.solve_cvrp
-        self._c_api_solve_cvrp.argtypes = [
+        hgs_library.solve_cvrp.argtypes = [
             c_int,
             c_double_p,
             c_double_p,
@@ -149,11 +204,9 @@ class Solver:
             POINTER(CAlgorithmParameters),
             c_char,
         ]
-        self._c_api_solve_cvrp.restype = POINTER(_Solution)
+        hgs_library.solve_cvrp.restype = POINTER(_Solution)
 
-        # solve_cvrp_dist_mtx
-        self._c_api_solve_cvrp_dist_mtx = hgs_library.solve_cvrp_dist_mtx
-        self._c_api_solve_cvrp_dist_mtx.argtypes = [
+        hgs_library.solve_cvrp_dist_mtx.argtypes = [
             c_int,
             c_double_p,
             c_double_p,
@@ -167,109 +220,1553 @@ class Solver:
             POINTER(CAlgorithmParameters),
             c_char,
         ]
-        self._c_api_solve_cvrp_dist_mtx.restype = POINTER(_Solution)
+        hgs_library.solve_cvrp_dist_mtx.restype = POINTER(_Solution)
+
+        hgs_library.delete_solution.restype = None
+        hgs_library.delete_solution.argtypes = [POINTER(_Solution)]
+        _hgs_library = hgs_library
+    return _hgs_library
+
+
+class RoutingSolution:
+    # hygese.metrics.SolveStats, set by a Solver with instrument=True
+    stats = None
+    # convergence history (TRACE_DTYPE array), set by a Solver with trace=True
+    trace = None
+
+    def __init__(self, sol_ptr):
+        if not sol_ptr:
+            raise TypeError("The solution pointer is null.")
+
+        self.cost = sol_ptr[0].cost
+        self.time = sol_ptr[0].time
+        self.n_routes = sol_ptr[0].n_routes
+        self.routes = []
+        for i in range(self.n_routes):
+            r = sol_ptr[0].routes[i]
+            path = r.path[0 : r.length]
+            self.routes.append(path)
+
+    @classmethod
+    def from_routes(cls, routes, cost, time=0.0):
+        """Build a solution from Python-side routes (depot excluded)."""
+        sol = cls.__new__(cls)
+        sol.cost = cost
+        sol.time = time
+        sol.n_routes = len(routes)
+        sol.routes = [[int(node) for node in route] for route in routes]
+        return sol
+
+
+class CompactRoutingSolution(RoutingSolution):
+    """RoutingSolution stored as one flat int32 array of visited nodes.
+
+    Route ``i`` is ``nodes[offsets[i]:offsets[i + 1]]``; ``routes`` is a list
+    of such views, built on first access. Each route is copied out of the C
+    solution with a single memmove instead of a per-node Python loop.
+    """
+
+    def __init__(self, sol_ptr):
+        if not sol_ptr:
+            raise TypeError("The solution pointer is null.")
+
+        sol = sol_ptr[0]
+        self.cost = sol.cost
+        self.time = sol.time
+        self.n_routes = sol.n_routes
+
+        lengths = np.fromiter(
+            (sol.routes[i].length for i in range(self.n_routes)),
+            dtype=np.int64,
+            count=self.n_routes,
+        )
+        self.offsets = np.zeros(self.n_routes + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.nodes = np.empty(self.offsets[-1], dtype=np.int32)
+
+        base = self.nodes.ctypes.data
+        itemsize = self.nodes.itemsize
+        for i in range(self.n_routes):
+            dst = base + int(self.offsets[i]) * itemsize
+            memmove(dst, sol.routes[i].path, int(lengths[i]) * itemsize)
+        self._routes = None
+
+    @classmethod
+    def from_routes(cls, routes, cost, time=0.0):
+        sol = cls.__new__(cls)
+        sol.cost = cost
+        sol.time = time
+        sol.n_routes = len(routes)
+        lengths = [len(route) for route in routes]
+        sol.offsets = np.zeros(sol.n_routes + 1, dtype=np.int64)
+        np.cumsum(lengths, out=sol.offsets[1:])
+        sol.nodes = np.fromiter(
+            (node for route in routes for node in route),
+            dtype=np.int32,
+            count=int(sol.offsets[-1]),
+        )
+        sol._routes = None
+        return sol
+
+    @property
+    def routes(self):
+        if self._routes is None:
+            # np.split of an empty array would give one empty route
+            self._routes = np.split(self.nodes, self.offsets[1:-1]) if self.n_routes else []
+        return self._routes
+
+
+@dataclass
+class SolveProgress:
+    """Search state reported to the ``Solver.solve_cvrp_anytime`` callback
+    every ``nbIterTraces`` iterations.
+
+    ``cost`` is the best feasible cost found so far (``inf`` while
+    ``feasible`` is False) and ``elapsed`` the time HGS reports.
+    """
+
+    iteration: int
+    iterations_no_improvement: int
+    elapsed: float
+    cost: float
+    feasible: bool
+
+
+@dataclass
+class CustomerChanges:
+    """Changes between a solved instance and its updated ``data``, for
+    ``Solver.reoptimize``.
+
+    ``removed`` lists customers of the previous instance whose rows were
+    deleted from ``data``; the remaining nodes keep their order. New
+    customers are appended to ``data`` and listed in ``added``, customers
+    whose demand or service time changed in ``changed``, both as node
+    indices of the updated ``data``.
+    """
+
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+
+
+# Rows per block when validating or converting a distance matrix; keeps
+# temporaries small even for memory-mapped n x n inputs.
+_DIST_BLOCK_ROWS = 256
+
 
-        # delete_solution
-        self._c_api_delete_sol = hgs_library.delete_solution
-        self._c_api_delete_sol.restype = None
-        self._c_api_delete_sol.argtypes = [POINTER(_Solution)]
+def _prepare_distance_matrix(dist_mtx):
+    """Validate ``dist_mtx`` and return it as a C-contiguous float64 array.
 
-    def solve_cvrp(self, data, rounding=True):
-        # required data
-        demand = np.asarray(data["demands"])
-        vehicle_capacity = data["vehicle_capacity"]
-        n_nodes = len(demand)
+    A C-contiguous float64 matrix (including an ``np.memmap``) is used in
+    place. Other dtypes and layouts, e.g. a float32 ``.npy`` file, are
+    converted block by block into a single float64 buffer. The input is read
+    once and no other full-size temporaries are created.
+    """
+    m = np.asarray(dist_mtx)
+    if m.ndim != 2 or m.shape[0] != m.shape[1]:
+        raise ValueError("distance_matrix must be a square matrix.")
 
-        # optional depot
-        depot = data.get("depot", 0)
+    in_place = m.dtype == np.float64 and m.flags["C_CONTIGUOUS"]
+    out = m if in_place else np.empty(m.shape, dtype=np.float64)
+    for start in range(0, m.shape[0], _DIST_BLOCK_ROWS):
+        block = out[start : start + _DIST_BLOCK_ROWS]
+        if not in_place:
+            block[...] = m[start : start + _DIST_BLOCK_ROWS]
+        if not (block >= 0.0).all():
+            raise ValueError("distance_matrix must be non-negative.")
+    return out
+
+
+class CVRPInstance:
+    """A validated CVRP instance, held in the buffers the C API reads.
+
+    Validation and float64 conversion happen once, here, with a single pass
+    over the node data; ``Solver.solve_cvrp`` accepts an instance in place of
+    a ``data`` dict and skips both, so re-solving the same instance costs only
+    the HGS run. Invalid input raises ``ValueError``.
+
+    The arguments mirror the ``data`` dict keys; ``from_data`` builds an
+    instance from such a dict, including sparse distances. ``rounding`` is
+    the ``solve_cvrp`` flag of the same name.
+    """
+
+    def __init__(
+        self,
+        demands,
+        vehicle_capacity,
+        x_coordinates=None,
+        y_coordinates=None,
+        distance_matrix=None,
+        service_times=None,
+        duration_limit=None,
+        num_vehicles=None,
+        depot=0,
+        rounding=True,
+    ):
         if depot != 0:
             raise ValueError("In HGS, the depot location must be 0.")
 
-        # optional num_vehicles
-        maximum_number_of_vehicles = data.get("num_vehicles", C_INT_MAX)
+        demands = np.asarray(demands)
+        n_nodes = len(demands)
+        has_coords = x_coordinates is not None and y_coordinates is not None
+        if not has_coords and distance_matrix is None:
+            raise ValueError("Either x_coordinates and y_coordinates or distance_matrix is required.")
 
-        # optional service_times
-        service_times = data.get("service_times")
-        if service_times is None:
-            service_times = np.zeros(n_nodes)
-        else:
-            service_times = np.asarray(service_times)
+        # x, y, service times and demands share one (4, n) buffer, so a single
+        # comparison validates all of them; each row is a C-contiguous array.
+        columns = (
+            ("x_coordinates", x_coordinates if has_coords else None),
+            ("y_coordinates", y_coordinates if has_coords else None),
+            ("service_times", service_times),
+            ("demands", demands),
+        )
+        nodes = np.zeros((4, n_nodes), dtype=np.float64)
+        bytes_copied = nodes.nbytes
+        for row, (name, values) in enumerate(columns):
+            if values is None:
+                continue
+            values = np.asarray(values)
+            if values.shape != (n_nodes,):
+                raise ValueError(
+                    "x_coordinates, y_coordinates, service_times and demands "
+                    f"must have the same length; {name} has shape {values.shape}."
+                )
+            nodes[row] = values
+        if not (nodes >= 0.0).all():
+            bad = [name for (name, _), ok in zip(columns, (nodes >= 0.0).all(axis=1)) if not ok]
+            raise ValueError(f"{', '.join(bad)} must be non-negative.")
 
-        # optional duration_limit
-        duration_limit = data.get("duration_limit")
-        if duration_limit is None:
-            is_duration_constraint = False
-            duration_limit = C_DBL_MAX
-        else:
-            is_duration_constraint = True
+        if distance_matrix is not None:
+            given = distance_matrix
+            distance_matrix = _prepare_distance_matrix(distance_matrix)
+            if not (isinstance(given, np.ndarray) and np.may_share_memory(given, distance_matrix)):
+                bytes_copied += distance_matrix.nbytes
+            if distance_matrix.shape[0] != n_nodes:
+                raise ValueError(f"distance_matrix must be {n_nodes} x {n_nodes}.")
+
+        self.n_nodes = n_nodes
+        self.has_coordinates = has_coords
+        self.x_coordinates, self.y_coordinates, self.service_times, self.demands = nodes
+        self.distance_matrix = distance_matrix
+        self.vehicle_capacity = float(vehicle_capacity)
+        self.is_duration_constraint = duration_limit is not None
+        self.duration_limit = C_DBL_MAX if duration_limit is None else float(duration_limit)
+        self.num_vehicles = C_INT_MAX if num_vehicles is None else int(num_vehicles)
+        self.rounding = bool(rounding)
+        # bytes converted into the float64 buffers above
+        self.bytes_copied = bytes_copied
+        self._digest = None
 
-        is_rounding_integer = rounding
+    @classmethod
+    def from_data(cls, data, rounding=True, metric=None):
+        """Build an instance from a ``solve_cvrp`` ``data`` dict.
 
+        With ``metric`` (see ``hygese.distances``), the distance matrix is
+        built from the coordinates instead of being read from ``data``.
+        """
         x_coords = data.get("x_coordinates")
         y_coords = data.get("y_coordinates")
         dist_mtx = data.get("distance_matrix")
 
-        if x_coords is None or y_coords is None:
-            assert dist_mtx is not None
-            x_coords = np.zeros(n_nodes)
-            y_coords = np.zeros(n_nodes)
+        if metric is not None:
+            if dist_mtx is not None or "neighbor_indices" in data:
+                raise ValueError("Pass either a metric or distances, not both.")
+            if x_coords is None or y_coords is None:
+                raise ValueError("A metric needs x_coordinates and y_coordinates.")
+            dist_mtx = distance_matrix(x_coords, y_coords, metric)
+            # With a matrix, HGS uses coordinates only for polar angles around
+            # the depot, which a translation preserves; shifting to the origin
+            # lets e.g. negative longitudes pass validation.
+            x_coords = np.asarray(x_coords, dtype=np.float64)
+            y_coords = np.asarray(y_coords, dtype=np.float64)
+            x_coords = x_coords - x_coords.min()
+            y_coords = y_coords - y_coords.min()
+
+        # sparse distance_matrix or neighbor lists are expanded to dense
+        elif has_sparse_distances(data):
+            dist_mtx = sparse_distance_matrix(
+                data, len(data["demands"]), x_coords, y_coords, rounding
+            )
+
+        return cls(
+            data["demands"],
+            data["vehicle_capacity"],
+            x_coordinates=x_coords,
+            y_coordinates=y_coords,
+            distance_matrix=dist_mtx,
+            service_times=data.get("service_times"),
+            duration_limit=data.get("duration_limit"),
+            num_vehicles=data.get("num_vehicles"),
+            depot=data.get("depot", 0),
+            rounding=rounding,
+        )
+
+    def metric(self):
+        """``TourMetric`` over the distances HGS optimizes; looks distances up
+        in the matrix, or computes them from the coordinates when none was
+        given, without building one."""
+        return TourMetric(
+            self.distance_matrix, self.x_coordinates, self.y_coordinates, self.rounding
+        )
+
+    def route_cost(self, route):
+        """Travel cost of ``route``; never builds the full matrix."""
+        if self.distance_matrix is not None:
+            return route_distance(route, self.distance_matrix)
+        return route_distance_xy(route, self.x_coordinates, self.y_coordinates, self.rounding)
+
+    def subproblem(self, customers, depot=0):
+        """``(nodes, data)`` for the CVRP restricted to ``depot`` and
+        ``customers``; ``data`` node i is node ``nodes[i]`` of this instance."""
+        nodes = np.concatenate(([depot], np.asarray(customers, dtype=np.int64)))
+        data = {
+            "demands": self.demands[nodes],
+            "service_times": self.service_times[nodes],
+            "vehicle_capacity": self.vehicle_capacity,
+        }
+        if self.has_coordinates:
+            data["x_coordinates"] = self.x_coordinates[nodes]
+            data["y_coordinates"] = self.y_coordinates[nodes]
+        if self.distance_matrix is not None:
+            data["distance_matrix"] = self.distance_matrix[np.ix_(nodes, nodes)]
+        if self.is_duration_constraint:
+            data["duration_limit"] = self.duration_limit
+        return nodes, data
+
+    @property
+    def digest(self):
+        """Fingerprint of the instance data, computed once."""
+        if self._digest is None:
+            self._digest = fingerprint(
+                (
+                    self.x_coordinates,
+                    self.y_coordinates,
+                    self.distance_matrix,
+                    self.service_times,
+                    self.demands,
+                ),
+                (
+                    self.vehicle_capacity,
+                    self.duration_limit,
+                    self.is_duration_constraint,
+                    self.num_vehicles,
+                    self.rounding,
+                ),
+            )
+        return self._digest
+
+
+def _depot_route_cost(metric, route, depot):
+    path = np.concatenate(([depot], np.asarray(route, dtype=np.int64), [depot]))
+    return float(metric.pairs(path[:-1], path[1:]).sum())
+
+
+def _process_context():
+    # Child processes are started by a fork server (or spawned, on Windows),
+    # never forked from the calling process, which may run threads.
+    import multiprocessing
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _anytime_child(conn, parameters, solution_format, instance):
+    # HGS prints its trace to the C stdout; point file descriptor 1 at a pipe
+    # and forward every line to the parent as it is printed.
+    read_fd, write_fd = os.pipe()
+    os.dup2(write_fd, 1)
+    os.close(write_fd)
+
+    def forward():
+        with os.fdopen(read_fd, errors="replace") as lines:
+            for line in lines:
+                conn.send(("line", line))
+
+    reader = threading.Thread(target=forward, daemon=True)
+    reader.start()
+    try:
+        solver = Solver(parameters, verbose=True, solution_format=solution_format)
+        message = ("done", True, solver.solve_cvrp(instance))
+    except Exception as exc:
+        message = ("done", False, exc)
+    sys.stdout.flush()
+    _c_fflush()
+    # closes the write end of the pipe, which ends the reader
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+    reader.join()
+    conn.send(message)
+    conn.close()
+
+
+# Solver owned by each process-pool worker, created once by the pool
+# initializer so the shared library is loaded once per worker process.
+_worker_solver = None
+
+
+def _init_worker_solver(
+    parameters, verbose, solution_format, presets=None, instrument=False, trace=False
+):
+    global _worker_solver
+    _worker_solver = Solver(
+        parameters,
+        verbose,
+        solution_format=solution_format,
+        presets=presets,
+        instrument=instrument,
+        trace=trace,
+    )
+
+
+def _worker_solve_cvrp(data, rounding, parameters=None, incumbent_routes=None):
+    solver = _worker_solver._with_parameters(parameters)
+    return solver.solve_cvrp(data, rounding=rounding, incumbent_routes=incumbent_routes)
+
+
+@dataclass
+class MultiDepotSolution:
+    """Outcome of ``Solver.solve_mdvrp``.
+
+    ``routes`` hold customers in the original node indices, depots left out;
+    route ``k`` starts and ends at depot node ``route_depots[k]``.
+    ``assignment[i]`` is the depot node serving node ``i`` (a depot maps to
+    itself) and ``moves`` counts the customers moved between depots by the
+    improvement rounds.
+    """
+
+    cost: float
+    time: float
+    routes: list
+    route_depots: list
+    assignment: np.ndarray
+    moves: int = 0
+
+    @property
+    def n_routes(self):
+        return len(self.routes)
+
+    def routes_by_depot(self):
+        """Routes grouped in a dict by depot node."""
+        grouped = {}
+        for route, depot in zip(self.routes, self.route_depots):
+            grouped.setdefault(depot, []).append(route)
+        return grouped
+
+
+@dataclass
+class VehicleType:
+    """A vehicle type of ``Solver.solve_hfvrp``; ``count=None`` means
+    unlimited vehicles of this type."""
+
+    capacity: float
+    count: int = None
+    fixed_cost: float = 0.0
+
+
+@dataclass
+class FleetSolution:
+    """Outcome of ``Solver.solve_hfvrp``.
+
+    ``routes`` are lists of customers, depot left out, served by a vehicle
+    of type ``vehicle_types[route_types[k]]``. ``cost`` is the travel
+    ``distance`` plus the ``fixed_cost`` of the vehicles used.
+    """
+
+    cost: float
+    time: float
+    routes: list
+    route_types: list
+    distance: float
+    fixed_cost: float
+
+    @property
+    def n_routes(self):
+        return len(self.routes)
+
+
+@dataclass
+class PortfolioResult:
+    """Outcome of ``Solver.solve_cvrp_portfolio``.
+
+    ``results[i]`` is the ``RoutingSolution`` of the run configured by
+    ``parameters[i]``, or the exception that run raised.
+    """
+
+    best: RoutingSolution
+    parameters: list = field(default_factory=list)
+    results: list = field(default_factory=list)
+
+    @property
+    def costs(self):
+        return [r.cost if isinstance(r, RoutingSolution) else None for r in self.results]
+
+    @property
+    def times(self):
+        return [r.time if isinstance(r, RoutingSolution) else None for r in self.results]
+
+
+class Solver:
+    def __init__(
+        self,
+        parameters=AlgorithmParameters(),
+        verbose=True,
+        solution_format="list",
+        cache=None,
+        instrument=False,
+        metrics=None,
+        trace=False,
+        presets=None,
+    ):
+        self.algorithm_parameters = parameters
+        self.verbose = verbose
+
+        # "list": routes as Python lists; "numpy": CompactRoutingSolution
+        if solution_format == "list":
+            self._solution_type = RoutingSolution
+        elif solution_format == "numpy":
+            self._solution_type = CompactRoutingSolution
         else:
-            x_coords = np.asarray(x_coords)
-            y_coords = np.asarray(y_coords)
-
-        assert len(x_coords) == len(y_coords) == len(service_times) == len(demand)
-        assert (x_coords >= 0.0).all()
-        assert (y_coords >= 0.0).all()
-        assert (service_times >= 0.0).all()
-        assert (demand >= 0.0).all()
-
-        if dist_mtx is not None:
-            dist_mtx = np.asarray(dist_mtx)
-            assert dist_mtx.shape[0] == dist_mtx.shape[1]
-            assert (dist_mtx >= 0.0).all()
-            return self._solve_cvrp_dist_mtx(
-                x_coords,
-                y_coords,
-                dist_mtx,
-                service_times,
-                demand,
+            raise ValueError(f"Unknown solution_format {solution_format!r}; use 'list' or 'numpy'.")
+        self.solution_format = solution_format
+
+        # optional hygese.SolutionCache shared by solve_cvrp / solve_tsp
+        self.cache = cache
+
+        # attach hygese.metrics.SolveStats to solutions; metrics(stats) is
+        # called after each solve and implies instrument
+        self.instrument = instrument or metrics is not None
+        self.metrics = metrics
+
+        # record the HGS progress lines as RoutingSolution.trace instead of
+        # printing them; see hygese._trace
+        self.trace = trace
+
+        # optional hygese.tune.ParameterPresets: parameters picked by instance
+        # size at solve time, in place of self.algorithm_parameters
+        self.presets = presets
+
+        # reusable (4, capacity) node buffer of solve_cvrp_into, with the C
+        # pointers to its rows, and its default output array
+        self._node_buffer = None
+        self._node_pointers = None
+        self._tour_buffer = None
+
+    # C entry points, bound from the process-wide library on first use, so
+    # creating a Solver loads nothing
+    _C_API = {
+        "_c_api_solve_cvrp": "solve_cvrp",
+        "_c_api_solve_cvrp_dist_mtx": "solve_cvrp_dist_mtx",
+        "_c_api_delete_sol": "delete_solution",
+    }
+
+    def __getattr__(self, name):
+        symbol = Solver._C_API.get(name)
+        if symbol is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        function = self.__dict__[name] = getattr(load_library(), symbol)
+        return function
+
+    def solve_cvrp(self, data, rounding=True, incumbent_routes=None, metric=None):
+        """Solve a CVRP given as a ``data`` dict or a ``CVRPInstance``.
+
+        ``rounding`` applies to dicts; an instance carries its own flag.
+        ``metric`` builds the distance matrix of a dict from its coordinates
+        with one of the ``hygese.distances`` kernels, e.g. ``"haversine"``.
+        HGS never returns on fewer than two customers, so such an instance
+        gets its trivial solution without a search.
+
+        ``incumbent_routes`` is an optional known solution, e.g. the previous
+        ``RoutingSolution.routes`` of a re-solved instance. It is repaired to
+        fit ``data`` (customers no longer present are dropped, new ones are
+        inserted greedily) and returned instead of the HGS solution whenever
+        it is feasible and cheaper, so a re-solve never does worse than the
+        plan it started from. This is a guard, not a warm start: the HGS
+        library cannot seed its population, so the search itself still
+        starts from random solutions and runs its full ``timeLimit``.
+
+        Distances may also be given sparsely, as a ``scipy.sparse``
+        ``distance_matrix`` or as k-nearest-neighbour lists
+        (``neighbor_indices`` / ``neighbor_distances``), with
+        ``missing_distance`` filling the other pairs; see
+        ``_sparse.sparse_distance_matrix``.
+
+        With ``instrument``, the solution's ``stats`` holds a
+        ``hygese.metrics.SolveStats`` timing breakdown.
+
+        With ``trace``, the solution's ``trace`` holds the convergence
+        history as a NumPy structured array of ``TRACE_DTYPE``, one row per
+        ``nbIterTraces`` iterations: population sizes, best and average
+        costs of both subpopulations, diversity, feasibility fractions and
+        penalty weights. HGS writes this history to the C ``stdout``, so
+        file descriptor 1 is captured during the solve and HGS's own lines
+        are not printed (unless ``verbose``, which then prints each solve's
+        output in one piece). Anything else the process printed meanwhile,
+        e.g. from other threads, is written back to stdout once the solve
+        ends. Captures hold a process-wide lock, so traced solves in threads
+        run one at a time; use ``executor="process"`` or a
+        ``SolverPool(trace=True)`` to run them in parallel.
+        """
+        start = time.perf_counter()
+        if isinstance(data, CVRPInstance):
+            instance = data
+            bytes_copied = 0
+        else:
+            instance = CVRPInstance.from_data(data, rounding=rounding, metric=metric)
+            bytes_copied = instance.bytes_copied
+        prepared = time.perf_counter()
+        timings = {}
+        parameters = self._parameters_for(instance.n_nodes)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = fingerprint(
+                (),
+                # a traced or instrumented result carries more than an
+                # untraced one, so it must not be served from one
+                (instance.digest, self.solution_format, self.trace, self.instrument),
+                parameters,
+                incumbent_routes,
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._record_stats(cached, instance, start, prepared, {}, bytes_copied)
+
+        if self.trace:
+            with capture_stdout() as captured:
+                result = self._native_solve(instance, parameters, True, timings)
+            result.trace, timings["iterations"] = parse_trace(captured[0])
+            printed = captured[0] if self.verbose else other_output(captured[0])
+            if printed:
+                sys.stdout.write(printed)
+                sys.stdout.flush()
+        else:
+            result = self._native_solve(instance, parameters, self.verbose, timings)
+
+        if incumbent_routes is not None:
+            routes = repair_routes(
+                incumbent_routes,
+                instance.metric(),
+                instance.demands,
+                instance.vehicle_capacity,
+                instance.num_vehicles,
+                instance.service_times,
+                instance.duration_limit if instance.is_duration_constraint else None,
+            )
+            if routes is not None:
+                cost = sum(instance.route_cost(r) for r in routes)
+                if cost < result.cost:
+                    trace = result.trace
+                    result = self._solution_type.from_routes(routes, cost, result.time)
+                    result.trace = trace
+
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return self._record_stats(result, instance, start, prepared, timings, bytes_copied)
+
+    def _record_stats(self, result, instance, start, prepared, timings, bytes_copied):
+        if not self.instrument:
+            return result
+        last = result.trace[-1] if result.trace is not None and result.trace.size else None
+        result.stats = SolveStats(
+            n_nodes=instance.n_nodes,
+            prepare_time=prepared - start,
+            native_time=timings.get("native", 0.0),
+            extract_time=timings.get("extract", 0.0),
+            total_time=time.perf_counter() - start,
+            hgs_time=result.time,
+            bytes_copied=bytes_copied,
+            cache_hit="native" not in timings,
+            iterations=timings.get("iterations"),
+            capacity_penalty=None if last is None else float(last["capacity_penalty"]),
+            duration_penalty=None if last is None else float(last["duration_penalty"]),
+        )
+        if self.metrics is not None:
+            self.metrics(result.stats)
+        return result
+
+    def solve_cvrp_into(
+        self,
+        demands,
+        vehicle_capacity,
+        x_coordinates=None,
+        y_coordinates=None,
+        distance_matrix=None,
+        service_times=None,
+        duration_limit=None,
+        num_vehicles=None,
+        rounding=True,
+        out=None,
+    ):
+        """Low-overhead ``solve_cvrp`` for small instances solved at high
+        rates; returns ``(cost, tour)``.
+
+        The arguments mirror ``CVRPInstance``. The node arrays are
+        copied into a buffer the solver keeps between calls, validated with a
+        single comparison, and the C call reuses the cached parameter struct
+        and buffer pointers. ``tour`` lists the routes as one giant tour
+        delimited by the depot, e.g. ``[0, 3, 1, 0, 2, 4, 0]``, written into
+        ``out`` (a C-contiguous int32 array of at least ``2 * n_nodes``
+        entries) or, by default, into an array owned by the solver, which
+        the next call overwrites. A ``distance_matrix`` is passed to HGS as
+        is when it is C-contiguous float64. Presets, caching,
+        instrumentation and traces are not applied; calls on the same solver
+        must not overlap.
+        """
+        n_nodes = len(demands)
+        if self._node_buffer is None or self._node_buffer.shape[1] < n_nodes:
+            grown = 0 if self._node_buffer is None else 2 * self._node_buffer.shape[1]
+            capacity = max(n_nodes, grown)
+            self._node_buffer = np.zeros((4, capacity), dtype=np.float64)
+            self._node_pointers = [row.ctypes.data_as(c_double_p) for row in self._node_buffer]
+            self._tour_buffer = np.empty(2 * capacity, dtype=np.int32)
+        nodes = self._node_buffer[:, :n_nodes]
+        if x_coordinates is None or y_coordinates is None:
+            if distance_matrix is None:
+                raise ValueError(
+                    "Either x_coordinates and y_coordinates or distance_matrix is required."
+                )
+            nodes[:2] = 0.0
+        else:
+            nodes[0] = x_coordinates
+            nodes[1] = y_coordinates
+        nodes[2] = 0.0 if service_times is None else service_times
+        nodes[3] = demands
+        if not (nodes >= 0.0).all():
+            raise ValueError("Coordinates, service_times and demands must be non-negative.")
+
+        if out is None:
+            out = self._tour_buffer
+        elif out.dtype != np.int32 or not out.flags["C_CONTIGUOUS"] or out.size < 2 * n_nodes:
+            raise ValueError(
+                f"out must be a C-contiguous int32 array of at least {2 * n_nodes} entries."
+            )
+
+        x, y, s, d = self._node_pointers
+        is_duration_constraint = duration_limit is not None
+        duration_limit = C_DBL_MAX if duration_limit is None else duration_limit
+        num_vehicles = C_INT_MAX if num_vehicles is None else num_vehicles
+        ap_ct = self.algorithm_parameters.ctypes
+        if distance_matrix is None:
+            sol_p = self._c_api_solve_cvrp(
+                n_nodes,
+                x,
+                y,
+                s,
+                d,
                 vehicle_capacity,
                 duration_limit,
+                rounding,
                 is_duration_constraint,
-                maximum_number_of_vehicles,
-                self.algorithm_parameters,
+                num_vehicles,
+                byref(ap_ct),
                 self.verbose,
             )
         else:
-            return self._solve_cvrp(
-                x_coords,
-                y_coords,
-                service_times,
-                demand,
+            m = _prepare_distance_matrix(distance_matrix)
+            if m.shape[0] != n_nodes:
+                raise ValueError(f"distance_matrix must be {n_nodes} x {n_nodes}.")
+            sol_p = self._c_api_solve_cvrp_dist_mtx(
+                n_nodes,
+                x,
+                y,
+                m.ctypes.data_as(c_double_p),
+                s,
+                d,
                 vehicle_capacity,
                 duration_limit,
-                is_rounding_integer,
                 is_duration_constraint,
-                maximum_number_of_vehicles,
-                self.algorithm_parameters,
+                num_vehicles,
+                byref(ap_ct),
                 self.verbose,
             )
+        if not sol_p:
+            raise TypeError("The solution pointer is null.")
 
-    def solve_tsp(self, data, rounding=True):
+        try:
+            sol = sol_p[0]
+            base = out.ctypes.data
+            out[0] = 0
+            pos = 1
+            for i in range(sol.n_routes):
+                route = sol.routes[i]
+                memmove(base + 4 * pos, route.path, 4 * route.length)
+                pos += route.length
+                out[pos] = 0
+                pos += 1
+            cost = sol.cost
+        finally:
+            self._c_api_delete_sol(sol_p)
+        return cost, out[:pos]
+
+    def reoptimize(
+        self, previous_solution, changes, data, time_limit=0.1, neighbor_routes=3, rounding=True
+    ):
+        """Update ``previous_solution`` after a few customers changed.
+
+        ``data`` is the updated instance (a dict or ``CVRPInstance``) and
+        ``changes`` a ``CustomerChanges`` describing how it differs from the
+        one ``previous_solution`` solved. The previous routes are mapped to
+        the new node indices, removed customers are dropped, and added or
+        changed customers (and any other customer not yet visited) are
+        inserted at their cheapest feasible position. HGS then re-solves,
+        within ``time_limit`` seconds, the customers of the routes this
+        touched and, for every inserted customer, of the first
+        ``neighbor_routes`` routes among those of its ``nbGranular`` nearest
+        customers. The other routes are kept as they are, and the repaired
+        routes serve as the incumbent of that solve (see ``solve_cvrp``), so
+        the result is never worse than the repair. ``time_limit=0`` returns
+        the repaired routes alone. If no feasible repair exists, the instance
+        is solved again in full.
+        """
+        start = time.perf_counter()
+        if isinstance(data, CVRPInstance):
+            instance = data
+        else:
+            instance = CVRPInstance.from_data(data, rounding=rounding)
+        metric = instance.metric()
+        duration_limit = instance.duration_limit if instance.is_duration_constraint else None
+
+        removed = np.sort(np.asarray(changes.removed, dtype=np.int64))
+        moved = np.zeros(instance.n_nodes, dtype=bool)
+        reinserted = np.asarray(list(changes.added) + list(changes.changed), dtype=np.int64)
+        moved[reinserted[(reinserted > 0) & (reinserted < instance.n_nodes)]] = True
+        previous = []
+        shortened = []
+        for route in previous_solution.routes:
+            route = np.asarray(route, dtype=np.int64)
+            length = route.size
+            route = route[~np.isin(route, removed)]
+            route = route - np.searchsorted(removed, route)
+            route = route[(route > 0) & (route < instance.n_nodes)]
+            route = route[~moved[route]]
+            if route.size:
+                previous.append(route.tolist())
+                shortened.append(route.size < length)
+
+        routes = repair_routes(
+            previous,
+            metric,
+            instance.demands,
+            instance.vehicle_capacity,
+            instance.num_vehicles,
+            instance.service_times,
+            duration_limit,
+        )
+        if routes is None:
+            return self.solve_cvrp(instance, incumbent_routes=previous)
+
+        # Routes that lost or gained customers (repair keeps the order of
+        # the non-empty previous routes and appends new ones), plus the routes
+        # of the granular neighbourhood of the customers inserted.
+        affected = {
+            k
+            for k, route in enumerate(routes)
+            if k >= len(previous) or shortened[k] or len(route) != len(previous[k])
+        }
+        route_of = np.full(instance.n_nodes, -1, dtype=np.int64)
+        for k, route in enumerate(routes):
+            route_of[route] = k
+        inserted = np.flatnonzero(moved)
+        granular = min(self.algorithm_parameters.nbGranular, instance.n_nodes - 1)
+        if inserted.size and granular > 0:
+            rows = metric.pairs(inserted[:, None], np.arange(instance.n_nodes)).astype(np.float64)
+            rows[:, 0] = np.inf
+            nearest = np.argpartition(rows, granular - 1, axis=1)[:, :granular]
+            order = np.take_along_axis(rows, nearest, axis=1).argsort(axis=1, kind="stable")
+            for candidates in np.take_along_axis(nearest, order, axis=1):
+                near_routes = dict.fromkeys(route_of[candidates].tolist())
+                near_routes.pop(-1, None)
+                affected.update(list(near_routes)[:neighbor_routes])
+
+        if time_limit > 0 and affected:
+            group = [routes[k] for k in sorted(affected)]
+            nodes, sub = instance.subproblem(np.concatenate(group))
+            if instance.num_vehicles != C_INT_MAX:
+                sub["num_vehicles"] = instance.num_vehicles - len(routes) + len(group)
+            local = np.empty(instance.n_nodes, dtype=np.int64)
+            local[nodes] = np.arange(nodes.size)
+            solver = self._with_parameters(
+                replace(self._parameters_for(nodes.size), timeLimit=time_limit)
+            )
+            result = solver.solve_cvrp(
+                sub, rounding=instance.rounding, incumbent_routes=[local[r].tolist() for r in group]
+            )
+            group = [[int(nodes[v]) for v in r] for r in result.routes]
+            routes = [r for k, r in enumerate(routes) if k not in affected] + group
+
+        cost = sum(instance.route_cost(r) for r in routes)
+        return self._solution_type.from_routes(routes, cost, time.perf_counter() - start)
+
+    def solve_many(
+        self,
+        instances,
+        workers=None,
+        executor="thread",
+        rounding=True,
+        return_exceptions=True,
+    ):
+        """Solve many CVRP instances concurrently.
+
+        Results are returned in input order. An instance that fails does not
+        abort the batch: its slot holds the raised exception, or, with
+        ``return_exceptions=False``, the first such exception is re-raised
+        once every instance has finished.
+
+        See ``iter_solve_many`` for the meaning of ``workers`` and ``executor``.
+        """
+        instances = list(instances)
+        results = [None] * len(instances)
+        for i, result in self.iter_solve_many(
+            instances, workers=workers, executor=executor, rounding=rounding
+        ):
+            results[i] = result
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def iter_solve_many(self, instances, workers=None, executor="thread", rounding=True):
+        """Solve many CVRP instances concurrently, yielding ``(index, result)``
+        pairs in completion order.
+
+        ``result`` is the ``RoutingSolution`` of ``instances[index]``, or the
+        exception raised while solving it.
+
+        With ``executor="thread"`` (default) the instances share this solver's
+        library binding; the ctypes call releases the GIL, so solves run in
+        parallel. HGS measures ``timeLimit`` with the C ``clock()``, however,
+        which outside Windows is the CPU time of the whole process, so
+        concurrent threads consume each other's budget (see
+        ``CLOCK_IS_CPU_TIME``). For ``timeLimit``-bound batches use
+        ``executor="process"``, which solves in ``workers`` processes that
+        each load the library once. The workers solve with this solver's
+        ``instrument`` and ``trace`` settings; their stats come back with the results and
+        the ``metrics`` hook is called here, in this process. The ``cache``
+        is not used by the workers.
+        """
+        tasks = [(data, rounding, None) for data in instances]
+        yield from self._iter_solve_tasks(tasks, workers, executor)
+
+    def solve_cvrp_portfolio(
+        self,
+        data,
+        seeds=(0, 1, 2, 3),
+        parameters=None,
+        time_limit=None,
+        workers=None,
+        executor="thread",
+        rounding=True,
+    ):
+        """Run independent HGS searches on the same instance and keep the best.
+
+        One run is launched for every combination of ``seeds`` and
+        ``parameters`` (a list of ``AlgorithmParameters``; defaults to this
+        solver's parameters). ``time_limit``, when given, overrides each run's
+        ``timeLimit`` and is a wall-clock budget per run: with the thread
+        executor, ``timeLimit`` is scaled by the number of runs executing at
+        once where HGS measures it in CPU time shared by the whole process
+        (``CLOCK_IS_CPU_TIME``, i.e. not on Windows).
+
+        Returns a ``PortfolioResult``; raises the first run's exception if
+        every run fails.
+        """
+        if parameters is None:
+            parameters = [self.algorithm_parameters]
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        runs = [replace(ap, seed=seed) for ap in parameters for seed in seeds]
+        if executor == "thread" and CLOCK_IS_CPU_TIME:
+            concurrency = min(workers, len(runs), os.cpu_count() or 1)
+        else:
+            concurrency = 1
+        for ap in runs:
+            budget = ap.timeLimit if time_limit is None else time_limit
+            ap.timeLimit = budget * concurrency
+
+        results = [None] * len(runs)
+        tasks = [(data, rounding, ap) for ap in runs]
+        for i, result in self._iter_solve_tasks(tasks, workers, executor):
+            results[i] = result
+
+        solved = [r for r in results if isinstance(r, RoutingSolution)]
+        if not solved:
+            raise next(r for r in results if isinstance(r, Exception))
+        best = min(solved, key=lambda r: r.cost)
+        return PortfolioResult(best=best, parameters=runs, results=results)
+
+    def solve_cvrp_anytime(self, data, callback, time_limit=None, rounding=True, mp_context=None):
+        """Solve while reporting progress, with the option to stop early.
+
+        A single HGS search runs in a child process (started from
+        ``mp_context``, by default a fork server, or spawned on Windows) and
+        streams its trace lines back. Every ``nbIterTraces`` iterations
+        ``callback(progress)`` receives a ``SolveProgress``. A truthy return
+        value terminates the child and this method returns None: HGS reports
+        only costs while it runs, so the routes of a stopped search are lost.
+        Otherwise returns the solution once the search ends. ``time_limit``,
+        when given, replaces ``timeLimit``; as the search has a process to
+        itself, it is close to wall-clock time.
+        """
+        if not isinstance(data, CVRPInstance):
+            data = CVRPInstance.from_data(data, rounding=rounding)
+        parameters = self._parameters_for(data.n_nodes)
+        if time_limit is not None:
+            parameters = replace(parameters, timeLimit=time_limit)
+
+        context = mp_context or _process_context()
+        conn, child = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_anytime_child,
+            args=(child, parameters, self.solution_format, data),
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        best = np.inf
+        try:
+            while True:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    process.join()
+                    raise RuntimeError(
+                        f"HGS solver process exited with code {process.exitcode}."
+                    ) from None
+                if message[0] == "done":
+                    ok, payload = message[1:]
+                    if not ok:
+                        raise payload
+                    return payload
+
+                line = message[1]
+                if self.verbose:
+                    sys.stdout.write(line)
+                row = parse_line(line)
+                if row is None:
+                    continue
+                if row[3] > 0:
+                    best = min(best, row[4])
+                progress = SolveProgress(
+                    iteration=row[0],
+                    iterations_no_improvement=row[1],
+                    elapsed=row[2],
+                    cost=best,
+                    feasible=bool(np.isfinite(best)),
+                )
+                if callback(progress):
+                    return None
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            conn.close()
+
+    def solve_cvrp_decomposed(
+        self,
+        data,
+        max_subproblem_size=500,
+        rounds=2,
+        workers=None,
+        executor="thread",
+        rounding=True,
+    ):
+        """Solve a large CVRP by decomposition into subproblems.
+
+        Customers are split into polar sectors around the depot of at most
+        ``max_subproblem_size`` customers, solved in parallel like
+        ``solve_many`` (see it for ``workers`` and ``executor``). Each of the
+        ``rounds`` improvement rounds then sorts the incumbent routes by the
+        polar angle of their centroid, regroups neighbouring routes into new
+        subproblems, shifted from the previous round's boundaries, and
+        re-solves them, keeping a subproblem's current routes unless HGS
+        finds cheaper ones. Needs coordinates; ``num_vehicles`` is not
+        enforced across subproblems.
+        """
+        start = time.perf_counter()
+        if isinstance(data, CVRPInstance):
+            instance = data
+        else:
+            instance = CVRPInstance.from_data(data, rounding=rounding)
+        if not instance.has_coordinates:
+            raise ValueError("Decomposition needs x_coordinates and y_coordinates.")
+
+        if instance.n_nodes == 1:
+            return self._solution_type.from_routes([], 0.0, time.perf_counter() - start)
+
+        angles = polar_angles(instance.x_coordinates, instance.y_coordinates)
+        customers = np.arange(1, instance.n_nodes)
+        customers = customers[np.argsort(angles[1:], kind="stable")]
+        n_groups = -(-customers.size // max_subproblem_size)
+        sectors = np.array_split(customers, n_groups)
+        routes = []
+        for group_routes in self._solve_groups(instance, sectors, [None] * n_groups, workers, executor):
+            routes.extend(group_routes)
+
+        x, y = instance.x_coordinates, instance.y_coordinates
+        for round_ in range(rounds):
+            centroids = np.array([np.arctan2(y[r].mean() - y[0], x[r].mean() - x[0]) for r in routes])
+            order = np.argsort(centroids, kind="stable")
+            shift = (round_ + 1) * max(1, len(routes) // (2 * n_groups))
+            order = np.roll(order, -shift)
+
+            groups = [[]]
+            size = 0
+            for k in order:
+                if size + len(routes[k]) > max_subproblem_size and groups[-1]:
+                    groups.append([])
+                    size = 0
+                groups[-1].append(routes[k])
+                size += len(routes[k])
+
+            members = [np.concatenate(group) for group in groups]
+            improved = self._solve_groups(instance, members, groups, workers, executor)
+            routes = []
+            for group, new_routes in zip(groups, improved):
+                old_cost = sum(instance.route_cost(r) for r in group)
+                new_cost = sum(instance.route_cost(r) for r in new_routes)
+                routes.extend(new_routes if new_cost < old_cost else group)
+
+        cost = sum(instance.route_cost(r) for r in routes)
+        return self._solution_type.from_routes(routes, cost, time.perf_counter() - start)
+
+    def solve_mdvrp(
+        self,
+        data,
+        assignment="nearest",
+        rounds=3,
+        workers=None,
+        executor="thread",
+        rounding=True,
+    ):
+        """Solve a CVRP with several depots.
+
+        ``data`` is a ``solve_cvrp`` dict whose ``depots`` key lists the depot
+        nodes; their demands and service times are ignored. ``num_vehicles``,
+        if given, must be a list with one fleet size per depot, and
+        ``depot_capacities`` the total demand each depot can serve.
+
+        Customers are first assigned to depots: with ``assignment="nearest"``
+        to the nearest one, with ``"capacity"`` by decreasing regret to the
+        nearest depot with capacity left (``depot_capacities``, or the fleet
+        capacity when ``num_vehicles`` is a list). The per-depot CVRPs are
+        solved in parallel like ``solve_many`` (see it for ``workers`` and
+        ``executor``). Each of the ``rounds`` improvement rounds then moves
+        customers into routes of other depots where that shortens the
+        solution, and re-solves the depots that changed, keeping a depot's
+        current routes unless HGS finds cheaper ones. Returns a
+        ``MultiDepotSolution``.
+        """
+        start = time.perf_counter()
+        n_nodes = len(data["demands"])
+        depots = np.asarray(data["depots"], dtype=np.int64)
+        if depots.size == 0 or np.unique(depots).size != depots.size:
+            raise ValueError("depots must list distinct depot nodes.")
+        if depots.min() < 0 or depots.max() >= n_nodes:
+            raise ValueError(f"depots must be node indices below {n_nodes}.")
+
+        fleets = data.get("num_vehicles")
+        if fleets is not None:
+            if np.ndim(fleets) != 1 or len(fleets) != depots.size:
+                raise ValueError("num_vehicles must be a list with one fleet size per depot.")
+            fleets = [int(f) for f in fleets]
+
+        demands = np.array(data["demands"], dtype=np.float64)
+        demands[depots] = 0.0
+        service_times = data.get("service_times")
+        if service_times is not None:
+            service_times = np.array(service_times, dtype=np.float64)
+            service_times[depots] = 0.0
+        instance = CVRPInstance.from_data(
+            dict(
+                data,
+                demands=demands,
+                service_times=service_times,
+                num_vehicles=None,
+                depot=0,
+            ),
+            rounding=rounding,
+        )
+
+        capacities = None
+        if assignment == "capacity":
+            capacities = data.get("depot_capacities")
+            if capacities is None and fleets is not None:
+                capacities = [f * instance.vehicle_capacity for f in fleets]
+            if capacities is None:
+                raise ValueError(
+                    "Capacity-aware assignment needs depot_capacities or one num_vehicles per depot."
+                )
+            capacities = np.asarray(capacities, dtype=np.float64)
+        elif assignment != "nearest":
+            raise ValueError(f"Unknown assignment {assignment!r}; use 'nearest' or 'capacity'.")
+
+        metric = TourMetric(
+            instance.distance_matrix,
+            instance.x_coordinates,
+            instance.y_coordinates,
+            instance.rounding,
+        )
+        customers = np.setdiff1d(np.arange(n_nodes), depots)
+        depot_dist = metric.pairs(depots[:, None], customers[None, :])
+        chosen = assign_depots(depot_dist, demands[customers], capacities)
+        served = np.empty(n_nodes, dtype=np.int64)
+        served[depots] = depots
+        served[customers] = depots[chosen]
+
+        fleet_of = dict(zip(depots.tolist(), fleets)) if fleets is not None else None
+        groups = {int(d): None for d in depots if (served[customers] == d).any()}
+        routes, route_depots = self._solve_depots(instance, served, groups, fleet_of, workers, executor)
+
+        depot_room = None
+        if capacities is not None:
+            depot_room = {
+                int(d): float(cap - demands[served == d].sum())
+                for d, cap in zip(depots, capacities)
+            }
+        duration_limit = instance.duration_limit if instance.is_duration_constraint else None
+        moves = 0
+        for _ in range(rounds):
+            routes, route_depots, moved = cross_depot_moves(
+                routes,
+                route_depots,
+                metric,
+                demands,
+                instance.service_times,
+                instance.vehicle_capacity,
+                duration_limit,
+                depot_room,
+            )
+            if not moved:
+                break
+            moves += moved
+
+            previous = served.copy()
+            for route, depot in zip(routes, route_depots):
+                served[route] = depot
+            changed = set(np.unique(previous[previous != served]).tolist())
+            changed |= set(np.unique(served[previous != served]).tolist())
+
+            grouped = {}
+            for route, depot in zip(routes, route_depots):
+                grouped.setdefault(depot, []).append(route)
+            current = {d: grouped[d] for d in changed if d in grouped}
+            new_routes, new_depots = self._solve_depots(
+                instance, served, current, fleet_of, workers, executor
+            )
+            improved = {}
+            for route, depot in zip(new_routes, new_depots):
+                improved.setdefault(depot, []).append(route)
+            routes, route_depots = [], []
+            for depot, group in grouped.items():
+                if depot in improved:
+                    old_cost = sum(_depot_route_cost(metric, r, depot) for r in group)
+                    new_cost = sum(_depot_route_cost(metric, r, depot) for r in improved[depot])
+                    if new_cost < old_cost:
+                        group = improved[depot]
+                routes.extend(group)
+                route_depots.extend([depot] * len(group))
+
+        cost = sum(_depot_route_cost(metric, r, d) for r, d in zip(routes, route_depots))
+        return MultiDepotSolution(
+            cost=cost,
+            time=time.perf_counter() - start,
+            routes=routes,
+            route_depots=route_depots,
+            assignment=served,
+            moves=moves,
+        )
+
+    def solve_hfvrp(self, data, vehicle_types, rounding=True):
+        """Solve a CVRP with a heterogeneous fleet.
+
+        ``vehicle_types`` lists ``VehicleType``s or ``(capacity, count,
+        fixed_cost)`` tuples; ``data`` needs no ``vehicle_capacity`` or
+        ``num_vehicles``. HGS handles a single capacity, so customers are
+        routed with the largest capacity, half the fixed cost of that type
+        added to every edge leaving or entering the depot so that the search
+        weighs opening a route against its distance. The routes then get
+        vehicle types by decreasing load, each the cheapest type that holds
+        it. Customers of routes left without a vehicle are routed again with
+        the largest capacity still available, until every route has one.
+        Under a ``duration_limit`` the fixed costs are not part of the search.
+
+        Returns a ``FleetSolution``; raises ``ValueError`` if the fleet
+        cannot serve every customer.
+        """
+        start = time.perf_counter()
+        types = [t if isinstance(t, VehicleType) else VehicleType(*t) for t in vehicle_types]
+        if not types:
+            raise ValueError("vehicle_types must not be empty.")
+        capacities = np.array([t.capacity for t in types], dtype=np.float64)
+        counts = np.array([np.inf if t.count is None else t.count for t in types])
+        fixed_costs = np.array([t.fixed_cost for t in types], dtype=np.float64)
+        instance = CVRPInstance.from_data(
+            dict(data, vehicle_capacity=capacities.max(), num_vehicles=None), rounding=rounding
+        )
+
+        routes, route_types = [], []
+        customers = np.arange(1, instance.n_nodes)
+        while customers.size:
+            available = np.flatnonzero(counts >= 1)
+            if available.size == 0:
+                raise ValueError("The fleet has too few vehicles to serve every customer.")
+            t = available[np.argmax(capacities[available])]
+            if instance.demands[customers].max() > capacities[t]:
+                raise ValueError("A customer's demand exceeds every available vehicle capacity.")
+
+            new_routes = self._route_customers(instance, customers, capacities[t], fixed_costs[t])
+            loads = [instance.demands[r].sum() for r in new_routes]
+            chosen, counts = assign_vehicle_types(loads, capacities, counts, fixed_costs)
+            unserved = []
+            for route, k in zip(new_routes, chosen):
+                if k < 0:
+                    unserved.extend(route)
+                else:
+                    routes.append(route)
+                    route_types.append(int(k))
+            customers = np.sort(np.asarray(unserved, dtype=np.int64))
+
+        distance = sum(instance.route_cost(r) for r in routes)
+        fixed_cost = float(fixed_costs[route_types].sum()) if routes else 0.0
+        return FleetSolution(
+            cost=distance + fixed_cost,
+            time=time.perf_counter() - start,
+            routes=routes,
+            route_types=route_types,
+            distance=distance,
+            fixed_cost=fixed_cost,
+        )
+
+    def _route_customers(self, instance, customers, capacity, fixed_cost):
+        # Routes of ``instance`` restricted to ``customers`` with the given
+        # vehicle capacity, a route's ``fixed_cost`` charged on its depot
+        # edges; returned in original node indices.
+        nodes, sub = instance.subproblem(customers)
+        sub["vehicle_capacity"] = capacity
+        if fixed_cost > 0 and not instance.is_duration_constraint:
+            if "distance_matrix" not in sub:
+                sub["distance_matrix"] = euclidean_matrix(
+                    sub["x_coordinates"], sub["y_coordinates"], instance.rounding
+                )
+            sub["distance_matrix"][0, 1:] += fixed_cost / 2
+            sub["distance_matrix"][1:, 0] += fixed_cost / 2
+        result = self.solve_cvrp(sub, rounding=instance.rounding)
+        return [[int(nodes[v]) for v in route] for route in result.routes]
+
+    def _solve_depots(self, instance, served, incumbents, fleet_of, workers, executor):
+        # Solve the CVRP of every depot in ``incumbents`` (a dict of current
+        # routes or None by depot node) over the customers ``served`` by it;
+        # returns (routes, route_depots).
+        depots = list(incumbents)
+        members = [np.flatnonzero((served == d) & (np.arange(served.size) != d)) for d in depots]
+        fleets = None if fleet_of is None else [fleet_of[d] for d in depots]
+        results = self._solve_groups(
+            instance,
+            members,
+            [incumbents[d] for d in depots],
+            workers,
+            executor,
+            depots=depots,
+            num_vehicles=fleets,
+        )
+        routes, route_depots = [], []
+        for depot, group in zip(depots, results):
+            routes.extend(group)
+            route_depots.extend([depot] * len(group))
+        return routes, route_depots
+
+    def _solve_groups(
+        self, instance, members, incumbents, workers, executor, depots=None, num_vehicles=None
+    ):
+        # Solve the subproblem induced by each customer set in ``members``,
+        # with the matching ``incumbents`` entry as incumbent routes; returns
+        # the routes of every subproblem in original node indices. ``depots`` and
+        # ``num_vehicles`` optionally give each subproblem its depot and fleet.
+        results = [None] * len(members)
+        tasks = []
+        solved = []
+        nodes_list = []
+        for k, (customers, routes) in enumerate(zip(members, incumbents)):
+            if len(customers) <= 1:
+                # HGS never returns on an instance with a single customer.
+                results[k] = [[int(c)] for c in customers]
+                continue
+            nodes, sub = instance.subproblem(customers, 0 if depots is None else depots[k])
+            if num_vehicles is not None:
+                sub["num_vehicles"] = num_vehicles[k]
+            if routes is not None:
+                local = {int(node): i for i, node in enumerate(nodes)}
+                routes = [[local[int(n)] for n in r] for r in routes]
+            nodes_list.append(nodes)
+            solved.append(k)
+            tasks.append((sub, instance.rounding, None, routes))
+
+        if not tasks:
+            return results
+        for i, result in self._iter_solve_tasks(tasks, workers, executor):
+            if isinstance(result, Exception):
+                raise result
+            results[solved[i]] = [[int(nodes_list[i][n]) for n in r] for r in result.routes]
+        return results
+
+    def _with_parameters(self, parameters):
+        # A shallow copy shares the library binding, so it costs no reload.
+        if parameters is None:
+            return self
+        solver = copy.copy(self)
+        solver.algorithm_parameters = parameters
+        solver.presets = None
+        return solver
+
+    def _solve_task(self, data, rounding, parameters, incumbent_routes=None):
+        solver = self._with_parameters(parameters)
+        return solver.solve_cvrp(data, rounding=rounding, incumbent_routes=incumbent_routes)
+
+    def _iter_solve_tasks(self, tasks, workers, executor):
+        # Each task is a (data, rounding, parameters[, incumbent_routes]) tuple;
+        # parameters=None means this solver's own AlgorithmParameters.
+        # concurrent.futures (and multiprocessing, for the process executor)
+        # is imported here to keep it out of the package import.
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(tasks)))
+
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers)
+            solve = self._solve_task
+        elif executor == "process":
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker_solver,
+                initargs=(
+                    self.algorithm_parameters,
+                    self.verbose,
+                    self.solution_format,
+                    self.presets,
+                    self.instrument,
+                    self.trace,
+                ),
+            )
+            solve = _worker_solve_cvrp
+        else:
+            raise ValueError(f"Unknown executor {executor!r}; use 'thread' or 'process'.")
+
+        try:
+            futures = {pool.submit(solve, *task): i for i, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                exc = future.exception()
+                if exc is not None:
+                    yield futures[future], exc
+                    continue
+                result = future.result()
+                # workers record stats but the hook lives in this process
+                if executor == "process" and self.metrics is not None and result.stats:
+                    self.metrics(result.stats)
+                yield futures[future], result
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def solve_tsp(self, data, rounding=True, incumbent_routes=None, metric=None, polish=True):
+        """Solve a TSP: one tour from node 0 through every node of ``data``.
+
+        ``data`` needs only coordinates or a distance matrix, and is not
+        modified. HGS runs on the equivalent single-vehicle CVRP with SWAP*
+        turned off, since it only exchanges customers between routes. With
+        ``polish`` and symmetric distances, the tour is then improved with
+        2-opt and Or-opt moves until none of them helps (see
+        ``_routes.polish_tour``).
+
+        The result also has a ``tour`` attribute: the visiting order as an
+        int32 array starting at node 0.
+        """
+        tsp = dict(data)
         x_coords = data.get("x_coordinates")
         dist_mtx = data.get("distance_matrix")
         if dist_mtx is None:
-            n_nodes = x_coords.size
+            n_nodes = len(x_coords)
         else:
-            dist_mtx = np.asarray(dist_mtx)
-            n_nodes = dist_mtx.shape[0]
+            n_nodes = dist_mtx.shape[0] if hasattr(dist_mtx, "shape") else len(dist_mtx)
+        tsp["num_vehicles"] = 1
+        tsp["depot"] = 0
+        tsp["demands"] = np.ones(n_nodes)
+        tsp["vehicle_capacity"] = n_nodes
+
+        instance = CVRPInstance.from_data(tsp, rounding=rounding, metric=metric)
+        parameters = self._parameters_for(instance.n_nodes)
+        solver = self._with_parameters(replace(parameters, useSwapStar=False))
+        result = solver.solve_cvrp(instance, incumbent_routes=incumbent_routes)
 
-        data["num_vehicles"] = 1
-        data["depot"] = 0
-        data["demands"] = np.ones(n_nodes)
-        data["vehicle_capacity"] = n_nodes
+        tour = np.concatenate(([0], *result.routes)).astype(np.int64)
+        if polish and n_nodes >= 5:
+            if instance.distance_matrix is not None:
+                tour_metric = TourMetric(dist_mtx=instance.distance_matrix)
+                symmetric = np.array_equal(instance.distance_matrix, instance.distance_matrix.T)
+            else:
+                tour_metric = TourMetric(
+                    x_coords=instance.x_coordinates,
+                    y_coords=instance.y_coordinates,
+                    rounding=instance.rounding,
+                )
+                symmetric = True
+            if symmetric:
+                polished = polish_tour(tour, tour_metric)
+                cost = float(tour_metric.legs(polished).sum())
+                if cost < result.cost:
+                    tour = polished
+                    stats, trace = result.stats, result.trace
+                    result = self._solution_type.from_routes([tour[1:]], cost, result.time)
+                    result.stats, result.trace = stats, trace
 
-        return self.solve_cvrp(data, rounding=rounding)
+        result.tour = tour.astype(np.int32)
+        return result
+
+    def _parameters_for(self, n_nodes):
+        if self.presets is None:
+            return self.algorithm_parameters
+        return self.presets.select(n_nodes)
+
+    def _native_solve(self, instance, parameters, verbose, timings):
+        if instance.n_nodes <= 2:
+            # HGS never returns without at least two customers; a single one
+            # gets its own route
+            routes = [[1]] if instance.n_nodes == 2 else []
+            cost = sum((instance.route_cost(r) for r in routes), 0.0)
+            timings["native"] = timings["extract"] = 0.0
+            return self._solution_type.from_routes(routes, cost)
+        if instance.distance_matrix is not None:
+            return self._solve_cvrp_dist_mtx(
+                instance.x_coordinates,
+                instance.y_coordinates,
+                instance.distance_matrix,
+                instance.service_times,
+                instance.demands,
+                instance.vehicle_capacity,
+                instance.duration_limit,
+                instance.is_duration_constraint,
+                instance.num_vehicles,
+                parameters,
+                verbose,
+                timings,
+            )
+        return self._solve_cvrp(
+            instance.x_coordinates,
+            instance.y_coordinates,
+            instance.service_times,
+            instance.demands,
+            instance.vehicle_capacity,
+            instance.duration_limit,
+            instance.rounding,
+            instance.is_duration_constraint,
+            instance.num_vehicles,
+            parameters,
+            verbose,
+            timings,
+        )
 
     def _solve_cvrp(
         self,
@@ -284,6 +1781,7 @@ class Solver:
         maximum_number_of_vehicles: int,
         algorithm_parameters: AlgorithmParameters,
         verbose: bool,
+        timings: dict = None,
     ):
         n_nodes = x_coords.size
         # Bind each contiguous float64 view to a local so the buffer is pinned
@@ -299,6 +1797,7 @@ class Solver:
         # 	int n, double* x, double* y, double* serv_time, double* dem,
         # 	double vehicleCapacity, double durationLimit, char isRoundingInteger, char isDurationConstraint,
         # 	int max_nbVeh, const struct AlgorithmParameters* ap, char verbose);
+        native_start = time.perf_counter()
         sol_p = self._c_api_solve_cvrp(
             n_nodes,
             x.ctypes.data_as(c_double_p),
@@ -314,11 +1813,16 @@ class Solver:
             verbose,
         )
 
+        native_end = time.perf_counter()
+
         try:
-            result = RoutingSolution(sol_p)
+            result = self._solution_type(sol_p)
         finally:
             if sol_p:
                 self._c_api_delete_sol(sol_p)
+        if timings is not None:
+            timings["native"] = native_end - native_start
+            timings["extract"] = time.perf_counter() - native_end
         return result
 
     def _solve_cvrp_dist_mtx(
@@ -334,6 +1838,7 @@ class Solver:
         maximum_number_of_vehicles: int,
         algorithm_parameters: AlgorithmParameters,
         verbose: bool,
+        timings: dict = None,
     ):
         n_nodes = x_coords.size
 
@@ -350,6 +1855,7 @@ class Solver:
         # 	int n, double* x, double* y, double *dist_mtx, double *serv_time, double *dem,
         # 	double vehicleCapacity, double durationLimit, char isDurationConstraint,
         # 	int max_nbVeh, const struct AlgorithmParameters *ap, char verbose);
+        native_start = time.perf_counter()
         sol_p = self._c_api_solve_cvrp_dist_mtx(
             n_nodes,
             x.ctypes.data_as(c_double_p),
@@ -365,9 +1871,14 @@ class Solver:
             verbose,
         )
 
+        native_end = time.perf_counter()
+
         try:
-            result = RoutingSolution(sol_p)
+            result = self._solution_type(sol_p)
         finally:
             if sol_p:
                 self._c_api_delete_sol(sol_p)
+        if timings is not None:
+            timings["native"] = native_end - native_start
+            timings["extract"] = time.perf_counter() - native_end
         return result
@@ -0,0 +1,292 @@
+"""Read and write CVRPLIB / TSPLIB instances and solutions.
+
+``read_instance`` parses a ``.vrp`` or ``.tsp`` file (optionally gzipped)
+straight into NumPy arrays: each numeric section is converted with a single
+``np.fromstring`` call, never through per-value Python objects.
+``iter_instances`` walks a directory or a tar archive lazily, one file at a
+time. ``read_solution`` / ``write_solution`` handle the ``.sol`` format::
+
+    Route #1: 1 4 3
+    Route #2: 2 5
+    Cost 1234
+
+Supported edge weights: ``EUC_2D`` (rounded, as HGS rounds), ``EXACT_2D``,
+``CEIL_2D``, ``ATT``, ``GEO`` and ``EXPLICIT`` in the full, row and
+diagonal-row matrix formats. Node 1 must be the single depot.
+"""
+
+import gzip
+import os
+import re
+import tarfile
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .distances import round_half_up
+
+INSTANCE_SUFFIXES = (".vrp", ".tsp", ".vrp.gz", ".tsp.gz")
+
+_SECTION = re.compile(rb"^\s*([A-Z_]+_SECTION)\s*:?\s*$", re.MULTILINE)
+_SPEC = re.compile(rb"^\s*([A-Z_]+)\s*:\s*(.*?)\s*$", re.MULTILINE)
+_BEST_KNOWN = re.compile(r"(?:Optimal|Best) value:\s*([\d.]+)")
+_EOF = re.compile(rb"^\s*EOF\s*$", re.MULTILINE)
+
+
+@dataclass
+class VRPLIBInstance:
+    """A parsed instance file.
+
+    ``data`` is the ``solve_cvrp`` / ``solve_tsp`` dict and ``rounding`` the
+    flag to solve it with. ``specs`` holds the raw ``KEY : value`` lines;
+    ``best_known`` is taken from an "Optimal value" / "Best value" note in
+    the COMMENT, if any.
+    """
+
+    name: str
+    data: dict
+    rounding: bool = False
+    best_known: float = None
+    specs: dict = field(default_factory=dict)
+
+
+def read_instance(source, name=None):
+    """Parse a CVRPLIB / TSPLIB instance from a path, a binary file object or
+    ``bytes``; returns a ``VRPLIBInstance``."""
+    raw = _read_bytes(source)
+    eof = _EOF.search(raw)
+    if eof:
+        raw = raw[: eof.start()]
+
+    headers = list(_SECTION.finditer(raw))
+    head_end = headers[0].start() if headers else len(raw)
+    specs = {k.decode(): v.decode() for k, v in _SPEC.findall(raw[:head_end])}
+    sections = {}
+    for k, match in enumerate(headers):
+        end = headers[k + 1].start() if k + 1 < len(headers) else len(raw)
+        sections[match.group(1).decode()] = raw[match.end() : end]
+
+    if name is None:
+        name = specs.get("NAME") or (os.path.basename(source) if isinstance(source, str) else "")
+    n = int(specs["DIMENSION"])
+
+    depots = _numbers(sections.get("DEPOT_SECTION", b"1 -1")).astype(np.int64)
+    if list(depots[depots > 0]) != [1]:
+        raise ValueError(f"{name}: only a single depot at node 1 is supported.")
+
+    data = {}
+    if "DEMAND_SECTION" in sections:
+        data["demands"] = _numbers(sections["DEMAND_SECTION"]).reshape(n, 2)[:, 1]
+    if "CAPACITY" in specs:
+        data["vehicle_capacity"] = float(specs["CAPACITY"])
+    if "VEHICLES" in specs:
+        data["num_vehicles"] = int(specs["VEHICLES"])
+    if "DISTANCE" in specs:
+        data["duration_limit"] = float(specs["DISTANCE"])
+    if "SERVICE_TIME" in specs:
+        data["service_times"] = np.r_[0.0, np.full(n - 1, float(specs["SERVICE_TIME"]))]
+    if "SERVICE_TIME_SECTION" in sections:
+        data["service_times"] = _numbers(sections["SERVICE_TIME_SECTION"]).reshape(n, 2)[:, 1]
+
+    coords = None
+    if "NODE_COORD_SECTION" in sections:
+        coords = _numbers(sections["NODE_COORD_SECTION"]).reshape(n, -1)
+        data["x_coordinates"] = coords[:, 1].copy()
+        data["y_coordinates"] = coords[:, 2].copy()
+
+    weight_type = specs.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+    rounding = False
+    if weight_type == "EUC_2D":
+        rounding = True
+    elif weight_type == "EXPLICIT":
+        weights = _numbers(sections["EDGE_WEIGHT_SECTION"])
+        data["distance_matrix"] = _explicit_matrix(weights, n, specs.get("EDGE_WEIGHT_FORMAT"), name)
+        if "DISPLAY_DATA_SECTION" in sections and coords is None:
+            display = _numbers(sections["DISPLAY_DATA_SECTION"]).reshape(n, -1)
+            data["x_coordinates"] = display[:, 1].copy()
+            data["y_coordinates"] = display[:, 2].copy()
+    elif weight_type in _COORD_METRICS:
+        data["distance_matrix"] = _COORD_METRICS[weight_type](
+            data["x_coordinates"], data["y_coordinates"]
+        )
+        if weight_type == "GEO":
+            # HGS would reject negative latitudes/longitudes; the matrix is
+            # already built, so shifted coordinates only serve polar angles.
+            data["x_coordinates"] = data["x_coordinates"] - data["x_coordinates"].min()
+            data["y_coordinates"] = data["y_coordinates"] - data["y_coordinates"].min()
+    elif weight_type != "EXACT_2D":
+        raise ValueError(f"{name}: unsupported edge weights {weight_type}.")
+
+    match = _BEST_KNOWN.search(specs.get("COMMENT", ""))
+    best_known = float(match.group(1)) if match else None
+    return VRPLIBInstance(name, data, rounding, best_known, specs)
+
+
+def iter_instances(source):
+    """Yield a ``VRPLIBInstance`` for every instance file in ``source``: a
+    directory (sorted by name), a tar archive (in archive order, optionally
+    compressed) or a single file. Files are read one at a time."""
+    if os.path.isdir(source):
+        for entry in sorted(os.listdir(source)):
+            if entry.endswith(INSTANCE_SUFFIXES):
+                yield read_instance(os.path.join(source, entry))
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, "r:*") as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(INSTANCE_SUFFIXES):
+                    raw = archive.extractfile(member).read()
+                    if member.name.endswith(".gz"):
+                        raw = gzip.decompress(raw)
+                    yield read_instance(raw)
+    else:
+        yield read_instance(source)
+
+
+def write_instance(path, data, name="instance", comment=None, rounding=True):
+    """Write a ``solve_cvrp`` / ``solve_tsp`` data dict as a CVRPLIB file
+    (TSPLIB if it has no demands). A distance matrix is written as an
+    ``EXPLICIT FULL_MATRIX``; otherwise coordinates are written as
+    ``EUC_2D`` when ``rounding``, else ``EXACT_2D``."""
+    dist_mtx = data.get("distance_matrix")
+    x = data.get("x_coordinates")
+    n = len(dist_mtx) if dist_mtx is not None else len(x)
+    is_cvrp = "demands" in data
+
+    lines = [f"NAME : {name}"]
+    if comment:
+        lines.append(f"COMMENT : {comment}")
+    lines += [f"TYPE : {'CVRP' if is_cvrp else 'TSP'}", f"DIMENSION : {n}"]
+    if dist_mtx is not None:
+        lines += ["EDGE_WEIGHT_TYPE : EXPLICIT", "EDGE_WEIGHT_FORMAT : FULL_MATRIX"]
+    else:
+        lines.append(f"EDGE_WEIGHT_TYPE : {'EUC_2D' if rounding else 'EXACT_2D'}")
+    if is_cvrp:
+        lines.append(f"CAPACITY : {_fmt(data['vehicle_capacity'])}")
+    if data.get("num_vehicles") is not None:
+        lines.append(f"VEHICLES : {int(data['num_vehicles'])}")
+    if data.get("duration_limit") is not None:
+        lines.append(f"DISTANCE : {_fmt(data['duration_limit'])}")
+
+    ids = np.arange(1, n + 1)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+        if x is not None:
+            coords = np.column_stack((ids, x, data["y_coordinates"]))
+            f.write("NODE_COORD_SECTION\n" if dist_mtx is None else "DISPLAY_DATA_SECTION\n")
+            np.savetxt(f, coords, fmt=["%d", "%.15g", "%.15g"])
+        if dist_mtx is not None:
+            f.write("EDGE_WEIGHT_SECTION\n")
+            np.savetxt(f, np.asarray(dist_mtx, dtype=np.float64), fmt="%.15g")
+        if is_cvrp:
+            f.write("DEMAND_SECTION\n")
+            np.savetxt(f, np.column_stack((ids, data["demands"])), fmt=["%d", "%.15g"])
+            if data.get("service_times") is not None:
+                f.write("SERVICE_TIME_SECTION\n")
+                np.savetxt(f, np.column_stack((ids, data["service_times"])), fmt=["%d", "%.15g"])
+            f.write("DEPOT_SECTION\n1\n-1\n")
+        f.write("EOF\n")
+
+
+def read_solution(source):
+    """``(routes, cost)`` from a ``.sol`` file; customers are numbered as in
+    ``RoutingSolution.routes`` (depot 0 left out). ``cost`` is None if the
+    file has no Cost line."""
+    text = _read_bytes(source).decode()
+    routes = [
+        [int(v) for v in m.group(1).split()]
+        for m in re.finditer(r"^\s*Route\s*#\d+\s*:(.*)$", text, re.MULTILINE)
+    ]
+    match = re.search(r"^\s*Cost\s*:?\s*([-\d.eE+]+)", text, re.MULTILINE)
+    return routes, float(match.group(1)) if match else None
+
+
+def write_solution(path, solution, cost=None):
+    """Write a ``RoutingSolution`` (or a list of routes and ``cost``) in the
+    ``.sol`` format."""
+    if hasattr(solution, "routes"):
+        routes = solution.routes
+        cost = solution.cost if cost is None else cost
+    else:
+        routes = solution
+    with open(path, "w") as f:
+        for k, route in enumerate(routes, start=1):
+            f.write(f"Route #{k}: {' '.join(str(int(v)) for v in route)}\n")
+        if cost is not None:
+            f.write(f"Cost {_fmt(cost)}\n")
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        raw = bytes(source)
+    elif hasattr(source, "read"):
+        raw = source.read()
+    else:
+        with open(source, "rb") as f:
+            raw = f.read()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    return raw
+
+
+def _numbers(section):
+    return np.fromstring(section.decode(), dtype=np.float64, sep=" ")
+
+
+def _fmt(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _explicit_matrix(weights, n, fmt, name):
+    if fmt == "FULL_MATRIX":
+        return weights.reshape(n, n)
+
+    matrix = np.zeros((n, n), dtype=np.float64)
+    # *_COL formats list the transposed triangle of the matching *_ROW one.
+    layouts = {
+        "UPPER_ROW": np.triu_indices(n, 1),
+        "LOWER_ROW": np.tril_indices(n, -1),
+        "UPPER_DIAG_ROW": np.triu_indices(n),
+        "LOWER_DIAG_ROW": np.tril_indices(n),
+        "UPPER_COL": np.tril_indices(n, -1)[::-1],
+        "LOWER_COL": np.triu_indices(n, 1)[::-1],
+        "UPPER_DIAG_COL": np.tril_indices(n)[::-1],
+        "LOWER_DIAG_COL": np.triu_indices(n)[::-1],
+    }
+    if fmt not in layouts:
+        raise ValueError(f"{name}: unsupported EDGE_WEIGHT_FORMAT {fmt}.")
+    rows, cols = layouts[fmt]
+    if weights.size != rows.size:
+        raise ValueError(f"{name}: expected {rows.size} edge weights, found {weights.size}.")
+    matrix[rows, cols] = weights
+    matrix[cols, rows] = weights
+    return matrix
+
+
+def _ceil_2d(x, y):
+    return np.ceil(np.hypot(x[:, None] - x, y[:, None] - y))
+
+
+def _att(x, y):
+    r = np.sqrt(((x[:, None] - x) ** 2 + (y[:, None] - y) ** 2) / 10.0)
+    t = round_half_up(r)
+    return np.where(t < r, t + 1.0, t)
+
+
+def _geo(x, y):
+    # TSPLIB GEO: coordinates are DDD.MM (degrees and minutes); x is the
+    # latitude, y the longitude.
+    def radians(v):
+        deg = np.trunc(v)
+        return np.pi * (deg + 5.0 * (v - deg) / 3.0) / 180.0
+
+    lat, lon = radians(x), radians(y)
+    q1 = np.cos(lon[:, None] - lon)
+    q2 = np.cos(lat[:, None] - lat)
+    q3 = np.cos(lat[:, None] + lat)
+    d = np.floor(6378.388 * np.arccos(np.clip(0.5 * ((1 + q1) * q2 - (1 - q1) * q3), -1, 1)) + 1)
+    np.fill_diagonal(d, 0.0)
+    return d
+
+
+_COORD_METRICS = {"CEIL_2D": _ceil_2d, "ATT": _att, "GEO": _geo}
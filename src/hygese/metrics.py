@@ -0,0 +1,97 @@
+"""Per-solve instrumentation.
+
+With ``Solver(..., instrument=True)`` every solution carries a ``stats``
+attribute, a ``SolveStats`` splitting the call into input preparation, the
+native HGS call and solution extraction. ``Solver(..., metrics=hook)``
+also calls ``hook(stats)`` after each solve; ``LoggingMetrics`` and
+``OpenTelemetryMetrics`` are ready-made hooks.
+"""
+
+import logging
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class SolveStats:
+    """Timing breakdown of one ``solve_cvrp`` call, in seconds.
+
+    ``native_time`` is the wall-clock time spent in the C call and
+    ``hgs_time`` the time HGS itself reports (C ``clock()`` time: process
+    CPU time, or wall time on Windows).
+    ``bytes_copied`` counts input converted into float64 buffers because it
+    was not already in the layout HGS reads. ``iterations`` and the final
+    penalty weights are only known with ``Solver(..., trace=True)``.
+    """
+
+    n_nodes: int
+    prepare_time: float = 0.0
+    native_time: float = 0.0
+    extract_time: float = 0.0
+    total_time: float = 0.0
+    hgs_time: float = 0.0
+    bytes_copied: int = 0
+    cache_hit: bool = False
+    iterations: int = None
+    capacity_penalty: float = None
+    duration_penalty: float = None
+
+    @property
+    def overhead(self):
+        """Wrapper time: everything but the native call."""
+        return self.total_time - self.native_time
+
+    def as_dict(self):
+        d = asdict(self)
+        d["overhead"] = self.overhead
+        return d
+
+
+class LoggingMetrics:
+    """Metrics hook logging one line per solve.
+
+    The values are also passed as ``extra={"hygese": stats.as_dict()}`` for
+    structured log handlers.
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("hygese")
+        self.level = level
+
+    def __call__(self, stats):
+        self.logger.log(
+            self.level,
+            "hygese solve: n_nodes=%d total=%.4fs native=%.4fs overhead=%.4fs "
+            "bytes_copied=%d cache_hit=%s",
+            stats.n_nodes,
+            stats.total_time,
+            stats.native_time,
+            stats.overhead,
+            stats.bytes_copied,
+            stats.cache_hit,
+            extra={"hygese": stats.as_dict()},
+        )
+
+
+class OpenTelemetryMetrics:
+    """Metrics hook recording histograms on an OpenTelemetry ``Meter``,
+    e.g. ``opentelemetry.metrics.get_meter("hygese")``.
+
+    One histogram per timing (``<prefix>.total_time`` etc., in seconds) and
+    one for ``bytes_copied``, each recorded with a ``cache_hit`` attribute.
+    """
+
+    TIMINGS = ("prepare_time", "native_time", "extract_time", "total_time", "hgs_time", "overhead")
+
+    def __init__(self, meter, prefix="hygese.solve"):
+        self._histograms = {
+            name: meter.create_histogram(f"{prefix}.{name}", unit="s") for name in self.TIMINGS
+        }
+        self._histograms["bytes_copied"] = meter.create_histogram(
+            f"{prefix}.bytes_copied", unit="By"
+        )
+
+    def __call__(self, stats):
+        values = stats.as_dict()
+        attributes = {"cache_hit": stats.cache_hit}
+        for name, histogram in self._histograms.items():
+            histogram.record(values[name], attributes=attributes)
@@ -0,0 +1,338 @@
+"""Persistent pool of HGS worker processes.
+
+Each worker process loads the HGS library once and then serves solves until
+it is recycled, so a request pays for neither the interpreter start nor the
+library load. Instance arrays are copied once into a
+``multiprocessing.shared_memory`` block that the worker solves from in place;
+large distance matrices are never pickled.
+
+::
+
+    with SolverPool(AlgorithmParameters(timeLimit=1.0), workers=4) as pool:
+        future = pool.submit(data, timeout=5.0)
+        result = future.result()
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import replace
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .hygese import C_INT_MAX, AlgorithmParameters, CVRPInstance, Solver, _process_context
+
+
+class WorkerCrashedError(RuntimeError):
+    """The worker process died during a solve, e.g. from a crash inside the
+    HGS library."""
+
+
+def _share(instance):
+    """Copy the arrays of ``instance`` into a new shared memory block and
+    return it with the spec a worker needs to rebuild the instance."""
+    n = instance.n_nodes
+    has_matrix = instance.distance_matrix is not None
+    size = 8 * (4 * n + (n * n if has_matrix else 0))
+    shm = SharedMemory(create=True, size=max(size, 1))
+    nodes = np.ndarray((4, n), dtype=np.float64, buffer=shm.buf)
+    nodes[:] = (
+        instance.x_coordinates,
+        instance.y_coordinates,
+        instance.service_times,
+        instance.demands,
+    )
+    if has_matrix:
+        matrix = np.ndarray((n, n), dtype=np.float64, buffer=shm.buf, offset=32 * n)
+        matrix[:] = instance.distance_matrix
+        del matrix
+    del nodes
+
+    spec = {
+        "name": shm.name,
+        "n_nodes": n,
+        "has_coordinates": instance.has_coordinates,
+        "has_matrix": has_matrix,
+        "vehicle_capacity": instance.vehicle_capacity,
+        "duration_limit": instance.duration_limit if instance.is_duration_constraint else None,
+        "num_vehicles": None if instance.num_vehicles == C_INT_MAX else instance.num_vehicles,
+        "rounding": instance.rounding,
+    }
+    return shm, spec
+
+
+def _attach(spec):
+    """Open the block described by ``spec``; return it with the instance
+    whose distance matrix is a view into it."""
+    shm = SharedMemory(name=spec["name"])
+
+    n = spec["n_nodes"]
+    x, y, service_times, demands = np.ndarray((4, n), dtype=np.float64, buffer=shm.buf)
+    matrix = None
+    if spec["has_matrix"]:
+        matrix = np.ndarray((n, n), dtype=np.float64, buffer=shm.buf, offset=32 * n)
+    instance = CVRPInstance(
+        demands,
+        spec["vehicle_capacity"],
+        x_coordinates=x if spec["has_coordinates"] else None,
+        y_coordinates=y if spec["has_coordinates"] else None,
+        distance_matrix=matrix,
+        service_times=service_times,
+        duration_limit=spec["duration_limit"],
+        num_vehicles=spec["num_vehicles"],
+        rounding=spec["rounding"],
+    )
+    return shm, instance
+
+
+def _serve(conn, parameters, verbose, solution_format, memory_limit, trace=False, instrument=False):
+    if memory_limit is not None and os.name == "posix":
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    solver = Solver(
+        parameters, verbose, solution_format=solution_format, trace=trace, instrument=instrument
+    )
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        spec, task_parameters = task
+        try:
+            shm, instance = _attach(spec)
+            try:
+                result = solver._with_parameters(task_parameters).solve_cvrp(instance)
+            finally:
+                # Views into the block must be gone before it can be closed.
+                del instance
+                shm.close()
+            conn.send((True, result))
+        except Exception as exc:
+            conn.send((False, exc))
+    conn.close()
+
+
+class _Worker:
+    def __init__(
+        self, context, parameters, verbose, solution_format, memory_limit, trace, instrument
+    ):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve,
+            args=(child, parameters, verbose, solution_format, memory_limit, trace, instrument),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.tasks_done = 0
+
+    def run(self, spec, parameters, timeout, poll_interval):
+        """Send one task and wait for its ``(ok, payload)`` reply."""
+        try:
+            self.conn.send((spec, parameters))
+        except OSError:  # the worker died before the task, e.g. at startup
+            self._crashed()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = poll_interval
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0.0))
+            if self.conn.poll(wait):
+                try:
+                    return self.conn.recv()
+                except EOFError:
+                    break
+            if not self.process.is_alive() and not self.conn.poll():
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                self.kill()
+                raise TimeoutError(f"HGS solve exceeded its {timeout} s timeout.")
+        self._crashed()
+
+    def _crashed(self):
+        self.process.join()
+        raise WorkerCrashedError(f"HGS worker process exited with code {self.process.exitcode}.")
+
+    def stop(self):
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(1.0)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SolverPool:
+    """Long-lived pool of ``workers`` processes (default: CPU count), each
+    holding a loaded ``Solver``.
+
+    ``submit`` returns a ``concurrent.futures.Future``. A solve that outlives
+    its ``timeout`` (wall-clock seconds once a worker picks it up) gets its
+    worker killed and fails with ``TimeoutError``; a worker that dies, e.g.
+    from a crash in the HGS library, fails its solve with
+    ``WorkerCrashedError``. Either way the worker is replaced and the pool
+    keeps serving. ``max_tasks_per_worker`` recycles workers after that many
+    solves. Workers are started from ``mp_context``, by default a fork server
+    (spawned on Windows). ``trace`` and ``instrument`` are the ``Solver``
+    options of the same name, applied in the workers.
+
+    For isolating a service from misbehaving solves:
+
+    - ``kill_grace``: without an explicit ``timeout``, a solve with a
+      ``timeLimit`` is killed ``kill_grace`` wall-clock seconds after its
+      ``timeLimit``.
+    - ``retries``: a solve that timed out or crashed is retried up to that
+      many times, each time on a fresh worker with the next seed.
+    - ``memory_limit``: address space limit in bytes of every worker (POSIX
+      only), so a runaway allocation fails that worker alone. It covers
+      the interpreter and the library too; a worker that cannot start
+      fails its solves with ``WorkerCrashedError``.
+    """
+
+    def __init__(
+        self,
+        parameters=AlgorithmParameters(),
+        workers=None,
+        verbose=False,
+        solution_format="list",
+        max_tasks_per_worker=None,
+        mp_context=None,
+        poll_interval=0.05,
+        kill_grace=None,
+        retries=0,
+        memory_limit=None,
+        trace=False,
+        instrument=False,
+    ):
+        self.algorithm_parameters = parameters
+        self.workers = workers or os.cpu_count() or 1
+        self.verbose = verbose
+        self.solution_format = solution_format
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.poll_interval = poll_interval
+        self.kill_grace = kill_grace
+        self.retries = retries
+        self.memory_limit = memory_limit
+        self.trace = trace
+        self.instrument = instrument
+        # Workers are replaced from the dispatcher threads, so they must not
+        # be forked from this process; see _process_context.
+        self._context = mp_context or _process_context()
+        if os.name == "posix":
+            # Workers then share the parent's resource tracker, so a block
+            # they attach to is unregistered once, when the parent unlinks it.
+            resource_tracker.ensure_running()
+        self._tasks = queue.Queue()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._dispatch, args=(self._spawn(),), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, data, rounding=True, timeout=None, parameters=None):
+        """Schedule ``solve_cvrp(data, rounding)``; ``data`` may also be a
+        ``CVRPInstance``. ``parameters`` overrides the pool's for this solve.
+        Invalid input raises ``ValueError`` here, not from the future."""
+        if self._closed:
+            raise RuntimeError("The pool is closed.")
+        if not isinstance(data, CVRPInstance):
+            data = CVRPInstance.from_data(data, rounding=rounding)
+        future = Future()
+        self._tasks.put((future, data, parameters, timeout))
+        return future
+
+    def map(self, instances, rounding=True, timeout=None):
+        """Solve all ``instances``; yield the results in input order,
+        raising the exception of a failed solve when it is reached."""
+        futures = [self.submit(data, rounding=rounding, timeout=timeout) for data in instances]
+        for future in futures:
+            yield future.result()
+
+    def close(self, wait=True):
+        """Stop accepting solves and shut the workers down once the queued
+        ones are done."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._tasks.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _spawn(self):
+        return _Worker(
+            self._context,
+            self.algorithm_parameters,
+            self.verbose,
+            self.solution_format,
+            self.memory_limit,
+            self.trace,
+            self.instrument,
+        )
+
+    def _deadline(self, timeout, parameters):
+        if timeout is None and self.kill_grace is not None and parameters.timeLimit > 0:
+            return parameters.timeLimit + self.kill_grace
+        return timeout
+
+    def _dispatch(self, worker):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                worker.stop()
+                return
+            future, instance, parameters, timeout = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            parameters = parameters or self.algorithm_parameters
+            shm, spec = _share(instance)
+            try:
+                for _ in range(self.retries + 1):
+                    try:
+                        ok, payload = worker.run(
+                            spec, parameters, self._deadline(timeout, parameters), self.poll_interval
+                        )
+                    except (TimeoutError, WorkerCrashedError) as exc:
+                        ok, payload = False, exc
+                    else:
+                        break
+                    worker.kill()
+                    worker = self._spawn()
+                    parameters = replace(parameters, seed=parameters.seed + 1)
+            finally:
+                shm.close()
+                shm.unlink()
+
+            worker.tasks_done += 1
+            if self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker:
+                worker.stop()
+                worker = self._spawn()
+
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(payload)
@@ -30,7 +30,7 @@ def or_tools_data():
     """The 17-node CVRP instance from the OR-Tools VRP tutorial.
 
     Returns a fresh dict each call so tests can mutate it without bleeding into
-    each other (note: Solver.solve_tsp also mutates the dict it receives).
+    each other.
     """
     return {
         "distance_matrix": [row[:] for row in _OR_TOOLS_DISTANCE_MATRIX],
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+import pytest
+
+from hygese import AlgorithmParameters, AsyncSolver
+
+
+def test_async_solve(or_tools_data, quick_ap):
+    async def main():
+        solver = AsyncSolver(quick_ap, max_concurrency=2)
+        try:
+            return await asyncio.gather(*[solver.solve_cvrp(or_tools_data) for _ in range(3)])
+        finally:
+            solver.close()
+
+    results = asyncio.run(main())
+    assert all(r.cost == results[0].cost > 0 for r in results)
+
+
+def test_async_error_is_raised(or_tools_data, quick_ap):
+    or_tools_data["depot"] = 1
+
+    async def main():
+        await AsyncSolver(quick_ap).solve_cvrp(or_tools_data)
+
+    with pytest.raises(ValueError, match="depot location must be 0"):
+        asyncio.run(main())
+
+
+def test_async_cancel_stops_solve(or_tools_data):
+    solver = AsyncSolver(AlgorithmParameters(timeLimit=60.0))
+
+    async def main():
+        task = asyncio.ensure_future(solver.solve_cvrp(or_tools_data))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    assert time.perf_counter() - start < 10.0
+
+
+def test_async_children_are_not_forked():
+    solver = AsyncSolver()
+    try:
+        assert solver._context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        solver.close()
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import hygese.hygese
+from hygese import AlgorithmParameters, Solver
+
+
+def _random_instance(n, seed):
+    rng = np.random.default_rng(seed)
+    demands = np.ones(n)
+    demands[0] = 0
+    return {
+        "x_coordinates": rng.random(n) * 1000,
+        "y_coordinates": rng.random(n) * 1000,
+        "demands": demands,
+        "vehicle_capacity": 5,
+    }
+
+
+def test_solve_many_matches_serial(quick_ap):
+    solver = Solver(quick_ap, verbose=False)
+    instances = [_random_instance(n, seed) for seed, n in enumerate([8, 12, 6, 10])]
+
+    results = solver.solve_many(instances, workers=2)
+
+    assert len(results) == len(instances)
+    for data, result in zip(instances, results):
+        visited = sorted(node for route in result.routes for node in route)
+        assert visited == list(range(1, len(data["demands"])))
+
+
+def test_solve_many_keeps_going_after_a_failure(or_tools_data, quick_ap):
+    solver = Solver(quick_ap, verbose=False)
+    bad = dict(or_tools_data, depot=1)
+
+    results = solver.solve_many([or_tools_data, bad, or_tools_data], workers=2)
+
+    assert isinstance(results[1], ValueError)
+    assert results[0].cost == results[2].cost > 0
+
+    with pytest.raises(ValueError, match="depot location must be 0"):
+        solver.solve_many([or_tools_data, bad], return_exceptions=False)
+
+
+def test_iter_solve_many_yields_every_index(or_tools_data, quick_ap):
+    solver = Solver(quick_ap, verbose=False)
+    indices = [i for i, _ in solver.iter_solve_many([or_tools_data] * 3, workers=3)]
+    assert sorted(indices) == [0, 1, 2]
+
+
+def test_solve_many_process_executor(or_tools_data, quick_ap):
+    solver = Solver(quick_ap, verbose=False)
+    results = solver.solve_many([or_tools_data] * 2, workers=2, executor="process")
+    assert all(r.cost > 0 for r in results)
+
+
+def test_process_executor_instrumentation(or_tools_data, quick_ap):
+    seen = []
+    solver = Solver(quick_ap, verbose=False, metrics=seen.append)
+    results = solver.solve_many([or_tools_data] * 2, workers=2, executor="process")
+    assert all(r.stats is not None and r.stats.n_nodes == 17 for r in results)
+    assert sorted(id(s) for s in seen) == sorted(id(r.stats) for r in results)
+
+
+def test_process_executor_traces(or_tools_data):
+    solver = Solver(AlgorithmParameters(nbIter=500, nbIterTraces=100), verbose=False, trace=True)
+    results = solver.solve_many([or_tools_data] * 2, workers=2, executor="process")
+    assert all(r.trace is not None and r.trace.size > 0 for r in results)
+
+
+def test_solve_many_unknown_executor(or_tools_data, quick_ap):
+    with pytest.raises(ValueError, match="Unknown executor"):
+        Solver(quick_ap, verbose=False).solve_many([or_tools_data], executor="gpu")
+
+
+def test_portfolio_returns_best_run(or_tools_data):
+    solver = Solver(AlgorithmParameters(nbIter=200), verbose=False)
+
+    result = solver.solve_cvrp_portfolio(or_tools_data, seeds=[1, 2, 3], workers=3)
+
+    assert [ap.seed for ap in result.parameters] == [1, 2, 3]
+    assert result.best.cost == min(result.costs)
+    assert all(t is not None for t in result.times)
+    # the solver's own parameters are left untouched
+    assert solver.algorithm_parameters.seed == 0
+
+
+def test_portfolio_parameter_sets(or_tools_data):
+    solver = Solver(verbose=False)
+    sets = [AlgorithmParameters(nbIter=100), AlgorithmParameters(nbIter=100, useSwapStar=False)]
+
+    result = solver.solve_cvrp_portfolio(or_tools_data, seeds=[0, 1], parameters=sets, time_limit=0.2)
+
+    assert len(result.results) == 4
+    assert [ap.useSwapStar for ap in result.parameters] == [True, True, False, False]
+    assert all(ap.timeLimit > 0 for ap in result.parameters)
+
+
+@pytest.mark.parametrize("cpu_clock, expected", [(True, 0.4), (False, 0.1)])
+def test_portfolio_time_limit_scaling(monkeypatch, or_tools_data, cpu_clock, expected):
+    # clock() is process CPU time except on Windows, where it is wall time
+    monkeypatch.setattr(hygese.hygese, "CLOCK_IS_CPU_TIME", cpu_clock)
+    monkeypatch.setattr(hygese.hygese.os, "cpu_count", lambda: 4)
+    solver = Solver(AlgorithmParameters(nbIter=100), verbose=False)
+
+    result = solver.solve_cvrp_portfolio(or_tools_data, seeds=[0, 1, 2, 3], time_limit=0.1)
+
+    assert [ap.timeLimit for ap in result.parameters] == pytest.approx([expected] * 4)
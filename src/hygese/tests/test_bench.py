@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+
+from hygese import AlgorithmParameters, bench
+
+
+def test_read_bundled_instances():
+    names = {}
+    for path in bench.bundled_instances():
+        name, data, rounding, best_known = bench.read_cvrplib(path)
+        names[name] = (data, rounding, best_known)
+
+    data, rounding, best_known = names["E-n22-k4"]
+    assert rounding and best_known == 375
+    assert len(data["x_coordinates"]) == len(data["demands"]) == 22
+    assert data["vehicle_capacity"] == 6000
+
+    data, rounding, best_known = names["ORTools-n17-k4"]
+    assert not rounding and best_known == 6208
+    assert data["distance_matrix"].shape == (17, 17)
+
+
+def test_run_benchmark_records():
+    records = bench.run_benchmark(seeds=[0, 1], parameters=AlgorithmParameters(nbIter=500))
+
+    assert len(records) == 2 * len(bench.bundled_instances())
+    for record in records:
+        assert set(record) == set(bench.FIELDS)
+        assert record["gap"] >= 0
+        assert record["wall_time"] >= record["native_time"]
+
+
+def test_cli_formats(tmp_path, capsys):
+    path = [p for p in bench.bundled_instances() if "E-n22" in p]
+    assert bench.main(path + ["--nb-iter", "200", "--format", "csv"]) == 0
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert [r["instance"] for r in rows] == ["E-n22-k4"]
+
+    out = tmp_path / "report.json"
+    bench.main(path + ["--nb-iter", "200", "--seeds", "3", "4", "--output", str(out)])
+    assert [r["seed"] for r in json.loads(out.read_text())] == [3, 4]
+
+
+def test_tsp_benchmark_cli(capsys):
+    assert bench.main(["--tsp", "30", "--nb-iter", "200", "--format", "csv"]) == 0
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert [r["path"] for r in rows] == ["cvrp", "tsp"]
+    assert float(rows[1]["cost"]) <= float(rows[0]["cost"])
+
+
+def test_overhead_benchmark():
+    records = bench.run_overhead_benchmark(sizes=(10,), calls=5)
+    assert [r["path"] for r in records] == ["solve_cvrp", "solve_cvrp_into"]
+    assert all(r["wall_time"] >= r["native_time"] > 0 for r in records)
+
+
+def test_startup_benchmark():
+    (record,) = bench.run_startup_benchmark(runs=1)
+    assert record["import_time"] > 0
+    assert record["first_solve_time"] > record["second_solve_time"] >= record["native_time"]
@@ -0,0 +1,59 @@
+from hygese import AlgorithmParameters, SolutionCache, Solver
+
+
+def test_repeated_solve_hits_cache(or_tools_data):
+    cache = SolutionCache(maxsize=4)
+    solver = Solver(AlgorithmParameters(nbIter=500), verbose=False, cache=cache)
+
+    first = solver.solve_cvrp(or_tools_data)
+    second = solver.solve_cvrp(or_tools_data)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.cost == first.cost and second.routes == first.routes
+    second.routes.clear()
+    assert solver.solve_cvrp(or_tools_data).routes == first.routes
+
+
+def test_key_covers_inputs_and_parameters(or_tools_data):
+    cache = SolutionCache()
+    Solver(AlgorithmParameters(nbIter=200), verbose=False, cache=cache).solve_cvrp(or_tools_data)
+    Solver(AlgorithmParameters(nbIter=200, seed=1), verbose=False, cache=cache).solve_cvrp(or_tools_data)
+    or_tools_data["vehicle_capacity"] = 16
+    Solver(AlgorithmParameters(nbIter=200), verbose=False, cache=cache).solve_cvrp(or_tools_data)
+
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert len(cache) == 3
+
+
+def test_key_covers_trace_and_instrument(or_tools_data):
+    cache = SolutionCache()
+    ap = AlgorithmParameters(nbIter=200)
+    Solver(ap, verbose=False, cache=cache).solve_cvrp(or_tools_data)
+    traced = Solver(ap, verbose=False, cache=cache, trace=True).solve_cvrp(or_tools_data)
+    Solver(ap, verbose=False, cache=cache, instrument=True).solve_cvrp(or_tools_data)
+
+    assert traced.trace is not None and traced.trace.size > 0
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_lru_eviction(or_tools_data):
+    cache = SolutionCache(maxsize=1)
+    solver = Solver(AlgorithmParameters(nbIter=200), verbose=False, cache=cache)
+    other = dict(or_tools_data, vehicle_capacity=16)
+
+    solver.solve_cvrp(or_tools_data)
+    solver.solve_cvrp(other)
+    solver.solve_cvrp(or_tools_data)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_disk_backend(or_tools_data, tmp_path):
+    ap = AlgorithmParameters(nbIter=200)
+    first = Solver(ap, verbose=False, cache=SolutionCache(directory=tmp_path)).solve_cvrp(or_tools_data)
+
+    cache = SolutionCache(directory=tmp_path, max_disk_entries=1)
+    assert Solver(ap, verbose=False, cache=cache).solve_cvrp(or_tools_data).routes == first.routes
+    assert cache.hits == 1
+
+    Solver(ap, verbose=False, cache=cache).solve_cvrp(dict(or_tools_data, vehicle_capacity=16))
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
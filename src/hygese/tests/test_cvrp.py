@@ -1,5 +1,23 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
 import numpy as np
-from hygese import AlgorithmParameters, Solver
+import pytest
+from hygese import (
+    TRACE_DTYPE,
+    AlgorithmParameters,
+    CompactRoutingSolution,
+    CustomerChanges,
+    RoutingSolution,
+    SolutionCache,
+    Solver,
+    VehicleType,
+    load_library,
+)
+from hygese.metrics import SolveStats
 
 
 def get_data():
@@ -138,3 +156,377 @@ def test_routing_solution_invariants():
         assert load <= capacity, (
             f"Route {route} has total demand {load} > capacity {capacity}"
         )
+
+
+def test_numpy_solution_format():
+    data = get_data()
+    ap = AlgorithmParameters(nbIter=500, seed=3)
+
+    listed = Solver(ap, verbose=False).solve_cvrp(data)
+    compact = Solver(ap, verbose=False, solution_format="numpy").solve_cvrp(data)
+
+    assert compact.cost == listed.cost
+    assert compact.n_routes == listed.n_routes
+    assert compact.nodes.dtype == np.int32
+    assert compact.offsets[0] == 0 and compact.offsets[-1] == compact.nodes.size
+    assert [r.tolist() for r in compact.routes] == listed.routes
+    # routes are views into the flat buffer, not copies
+    assert all(np.shares_memory(r, compact.nodes) for r in compact.routes)
+
+
+def test_numpy_solution_without_routes():
+    empty = CompactRoutingSolution.from_routes([], 0.0)
+    assert empty.n_routes == 0 and empty.routes == []
+    assert empty.offsets.tolist() == [0] and empty.nodes.size == 0
+
+
+def _random_cvrp(n, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        'x_coordinates': rng.random(n) * 1000,
+        'y_coordinates': rng.random(n) * 1000,
+        'demands': np.r_[0, rng.integers(1, 10, n - 1)],
+        'vehicle_capacity': 30,
+    }
+
+
+def test_never_worse_than_incumbent_routes():
+    data = _random_cvrp(80, seed=1)
+    best = Solver(AlgorithmParameters(timeLimit=2.0), verbose=False).solve_cvrp(data)
+
+    # A one-iteration run with a tiny population is weaker than a 2s solve,
+    # so the returned cost can only come from the incumbent.
+    quick = Solver(AlgorithmParameters(nbIter=1, mu=2, lambda_=2), verbose=False)
+    assert quick.solve_cvrp(data).cost > best.cost
+    result = quick.solve_cvrp(data, incumbent_routes=best.routes)
+    assert result.cost == best.cost
+    assert result.routes == best.routes
+
+
+def test_incumbent_inserts_new_customers():
+    data = get_data()
+    n_nodes = len(data['demands'])
+    incumbent = [[14, 16, 10, 9], [5, 2, 6, 8], [1, 4, 3, 7], [13, 11, 12]]  # 15 is new
+
+    ap = AlgorithmParameters(nbIter=1, mu=2, lambda_=2)
+    result = Solver(ap, verbose=False).solve_cvrp(data, incumbent_routes=incumbent)
+
+    visited = sorted(node for route in result.routes for node in route)
+    assert visited == list(range(1, n_nodes))
+    assert result.cost == 6208
+
+
+def test_incumbent_with_too_many_vehicles_is_rejected():
+    # customers are far apart but close to the depot: one route each is
+    # cheapest, but only two vehicles are available
+    dist = np.full((5, 5), 100.0)
+    dist[0, :] = dist[:, 0] = 10.0
+    np.fill_diagonal(dist, 0.0)
+    data = {
+        'distance_matrix': dist,
+        'demands': [0, 1, 1, 1, 1],
+        'vehicle_capacity': 10,
+        'num_vehicles': 2,
+    }
+    ap = AlgorithmParameters(nbIter=100)
+    result = Solver(ap, verbose=False).solve_cvrp(data, incumbent_routes=[[1], [2], [3], [4]])
+
+    assert result.n_routes <= 2
+    assert result.cost == 240
+
+
+def test_anytime_callback_and_early_stop():
+    data = _random_cvrp(100, seed=2)
+    solver = Solver(AlgorithmParameters(nbIterTraces=100), verbose=False)
+
+    seen = []
+
+    def callback(progress):
+        seen.append(progress)
+        return progress.iteration >= 300
+
+    start = time.perf_counter()
+    assert solver.solve_cvrp_anytime(data, callback, time_limit=60.0) is None
+    assert time.perf_counter() - start < 30.0
+
+    assert [p.iteration for p in seen] == [0, 100, 200, 300]
+    assert all(p.feasible for p in seen[1:])
+    costs = [p.cost for p in seen]
+    assert costs == sorted(costs, reverse=True)
+    assert 0 < seen[-1].elapsed < 30.0
+
+
+def test_anytime_runs_to_completion():
+    data = _random_cvrp(40, seed=2)
+    solver = Solver(AlgorithmParameters(nbIter=200, nbIterTraces=50), verbose=False)
+
+    seen = []
+    result = solver.solve_cvrp_anytime(data, seen.append)
+
+    assert seen and all(p.iteration % 50 == 0 for p in seen)
+    assert result.cost <= seen[-1].cost
+
+
+def test_decomposed_solution_is_feasible():
+    data = _random_cvrp(301, seed=4)
+    ap = AlgorithmParameters(nbIter=100)
+    result = Solver(ap, verbose=False).solve_cvrp_decomposed(
+        data, max_subproblem_size=100, rounds=2, workers=2
+    )
+
+    visited = sorted(node for route in result.routes for node in route)
+    assert visited == list(range(1, 301))
+    demand = data['demands']
+    assert all(demand[route].sum() <= data['vehicle_capacity'] for route in result.routes)
+
+    x, y = data['x_coordinates'], data['y_coordinates']
+    cost = 0
+    for route in result.routes:
+        path = [0] + route + [0]
+        cost += sum(round(np.hypot(x[a] - x[b], y[a] - y[b])) for a, b in zip(path, path[1:]))
+    assert result.cost == cost
+
+
+def test_decomposed_small_subproblems():
+    # one customer per sector: HGS never returns on such a subproblem
+    data = _random_cvrp(3, seed=4)
+    solver = Solver(AlgorithmParameters(nbIter=100), verbose=False)
+    result = solver.solve_cvrp_decomposed(data, max_subproblem_size=1, rounds=2)
+    assert sorted(result.routes) == [[1], [2]]
+
+    depot_only = {k: v[:1] for k, v in data.items() if k != 'vehicle_capacity'}
+    result = solver.solve_cvrp_decomposed(dict(depot_only, vehicle_capacity=30))
+    assert result.routes == [] and result.cost == 0
+
+
+def test_multi_depot_solution_is_feasible():
+    data = _random_cvrp(200, seed=5)
+    data['depots'] = [0, 7, 42]
+    data['demands'][[7, 42]] = 5  # ignored at depots
+    data['vehicle_capacity'] = 60
+    ap = AlgorithmParameters(nbIter=200)
+    result = Solver(ap, verbose=False).solve_mdvrp(data, rounds=2, workers=2)
+
+    visited = sorted(node for route in result.routes for node in route)
+    assert visited == sorted(set(range(200)) - {0, 7, 42})
+    demand = data['demands']
+    assert all(demand[route].sum() <= data['vehicle_capacity'] for route in result.routes)
+    assert set(result.routes_by_depot()) <= {0, 7, 42}
+    for route, depot in zip(result.routes, result.route_depots):
+        assert (result.assignment[route] == depot).all()
+
+    x, y = data['x_coordinates'], data['y_coordinates']
+    cost = 0
+    for route, depot in zip(result.routes, result.route_depots):
+        path = [depot] + route + [depot]
+        cost += sum(round(np.hypot(x[a] - x[b], y[a] - y[b])) for a, b in zip(path, path[1:]))
+    assert result.cost == cost
+
+
+def test_multi_depot_capacity_assignment():
+    data = get_data()
+    data['depots'] = [0, 2]
+    data['num_vehicles'] = [2, 2]
+    del data['depot']
+    ap = AlgorithmParameters(nbIter=200)
+    result = Solver(ap, verbose=False).solve_mdvrp(data, assignment='capacity', rounding=False)
+
+    demand = np.asarray(data['demands'])
+    for depot, routes in result.routes_by_depot().items():
+        assert len(routes) <= 2
+        assert sum(demand[r].sum() for r in routes) <= 2 * data['vehicle_capacity']
+
+
+def test_multi_depot_single_customer_depot():
+    # node 38 alone near depot 39: its one-customer CVRP must not reach HGS
+    data = _random_cvrp(40, seed=7)
+    data['x_coordinates'][:38] = np.linspace(0, 100, 38)
+    data['y_coordinates'][:38] = 0
+    data['x_coordinates'][38:] = [5000, 5001]
+    data['y_coordinates'][38:] = 5000
+    data['depots'] = [0, 39]
+    result = Solver(AlgorithmParameters(nbIter=100), verbose=False).solve_mdvrp(data)
+
+    assert result.routes_by_depot()[39] == [[38]]
+    visited = sorted(node for route in result.routes for node in route)
+    assert visited == list(range(1, 39))
+
+
+def test_multi_depot_rejects_scalar_fleet():
+    data = get_data()
+    data['depots'] = [0, 2]
+    del data['depot']
+    data['num_vehicles'] = 2
+    with pytest.raises(ValueError, match="one fleet size per depot"):
+        Solver(verbose=False).solve_mdvrp(data)
+
+
+def test_heterogeneous_fleet():
+    data = _random_cvrp(120, seed=6)
+    del data['vehicle_capacity']
+    types = [VehicleType(20, fixed_cost=100), (45, 2, 250)]
+    ap = AlgorithmParameters(nbIter=300)
+    result = Solver(ap, verbose=False).solve_hfvrp(data, types)
+
+    visited = sorted(node for route in result.routes for node in route)
+    assert visited == list(range(1, 120))
+    capacity = np.array([20, 45])
+    demand = data['demands']
+    assert all(demand[r].sum() <= capacity[t] for r, t in zip(result.routes, result.route_types))
+    assert result.route_types.count(1) <= 2
+    assert result.fixed_cost == sum([100, 250][t] for t in result.route_types)
+    assert result.cost == result.distance + result.fixed_cost
+
+    with pytest.raises(ValueError):
+        Solver(ap, verbose=False).solve_hfvrp(data, [(45, 2, 0)])
+
+
+def test_heterogeneous_fleet_single_customer():
+    data = _random_cvrp(2, seed=9)
+    del data['vehicle_capacity']
+    result = Solver(verbose=False).solve_hfvrp(data, [(20, 1, 100)])
+    assert result.routes == [[1]] and result.route_types == [0]
+    x, y = data['x_coordinates'], data['y_coordinates']
+    assert result.distance == 2 * round(np.hypot(x[1] - x[0], y[1] - y[0]))
+
+
+def test_reoptimize_after_changes():
+    data = _random_cvrp(150, seed=7)
+    solver = Solver(AlgorithmParameters(timeLimit=1.0), verbose=False)
+    previous = solver.solve_cvrp(data)
+
+    rng = np.random.default_rng(8)
+    keep = np.setdiff1d(np.arange(150), [3, 60])
+    updated = {
+        'x_coordinates': np.r_[data['x_coordinates'][keep], rng.random(2) * 1000],
+        'y_coordinates': np.r_[data['y_coordinates'][keep], rng.random(2) * 1000],
+        'demands': np.r_[data['demands'][keep], [4, 6]],
+        'vehicle_capacity': 30,
+    }
+    updated['demands'][20] += 5
+    changes = CustomerChanges(added=[148, 149], removed=[3, 60], changed=[20])
+
+    repaired = solver.reoptimize(previous, changes, updated, time_limit=0)
+    result = solver.reoptimize(previous, changes, updated, time_limit=0.2)
+    for solution in (repaired, result):
+        visited = sorted(node for route in solution.routes for node in route)
+        assert visited == list(range(1, 150))
+        demand = updated['demands']
+        assert all(demand[r].sum() <= 30 for r in solution.routes)
+    assert result.cost <= repaired.cost
+
+    # Without a re-solve, routes away from the changes are kept as they were.
+    shift = lambda r: [v - (v > 3) - (v > 60) for v in r if v not in (3, 60)]
+    untouched = [shift(r) for r in previous.routes if not {3, 60, 21} & set(r)]
+    assert sum(r in repaired.routes for r in untouched) >= len(untouched) - 3  # 3 insertions
+
+
+def test_reoptimize_single_customer_route():
+    # removing 2 from [2, 1] leaves a one-customer subproblem to re-solve
+    data = _random_cvrp(7, seed=10)
+    previous = RoutingSolution.from_routes([[2, 1], [3, 4], [5, 6]], 0.0)
+    updated = {k: np.delete(v, 2) if k != 'vehicle_capacity' else v for k, v in data.items()}
+    solver = Solver(AlgorithmParameters(nbIter=100), verbose=False)
+    result = solver.reoptimize(previous, CustomerChanges(removed=[2]), updated, time_limit=0.1)
+    assert sorted(result.routes) == [[1], [2, 3], [4, 5]]
+
+
+def test_solve_cvrp_into_matches_solve_cvrp(or_tools_data):
+    ap = AlgorithmParameters(nbIter=500)
+    solver = Solver(ap, verbose=False)
+    data = _random_cvrp(30, seed=9)
+    result = solver.solve_cvrp(data)
+
+    cost, tour = solver.solve_cvrp_into(**data)
+    assert cost == result.cost
+    routes = [r.tolist() for r in np.split(tour[1:-1], np.flatnonzero(tour[1:-1] == 0)) if r.size]
+    routes = [[v for v in r if v] for r in routes]
+    assert routes == result.routes
+
+    out = np.full(2 * 17, -1, dtype=np.int32)
+    expected = solver.solve_cvrp(or_tools_data, rounding=False)
+    cost, tour = solver.solve_cvrp_into(
+        or_tools_data['demands'],
+        or_tools_data['vehicle_capacity'],
+        distance_matrix=or_tools_data['distance_matrix'],
+        num_vehicles=or_tools_data['num_vehicles'],
+        out=out,
+    )
+    assert cost == expected.cost and tour.base is out and tour[0] == tour[-1] == 0
+
+    with pytest.raises(ValueError):
+        solver.solve_cvrp_into(**data, out=np.empty(10, dtype=np.int64))
+
+
+def test_parameter_struct_is_cached():
+    ap = AlgorithmParameters()
+    assert ap.ctypes is ap.ctypes
+    ap.seed = 7
+    assert ap.ctypes.seed == 7
+
+
+def test_lazy_import_and_library_loading():
+    code = "import sys, hygese; print('numpy' in sys.modules, hygese._hgs_library is None)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "True"]
+
+    libs = []
+    threads = [threading.Thread(target=lambda: libs.append(load_library())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(libs) == 4 and all(lib is libs[0] for lib in libs)
+
+    solver = Solver(verbose=False)
+    assert not any(name.startswith("_c_api") for name in vars(solver))
+    assert solver._c_api_solve_cvrp is solver._c_api_solve_cvrp
+
+
+def test_instrumented_solve(or_tools_data, quick_ap):
+    seen = []
+    solver = Solver(quick_ap, verbose=False, cache=SolutionCache(), metrics=seen.append)
+    result = solver.solve_cvrp(or_tools_data)
+    cached = solver.solve_cvrp(or_tools_data)
+
+    stats = result.stats
+    assert isinstance(stats, SolveStats) and seen == [stats, cached.stats]
+    assert stats.n_nodes == 17 and not stats.cache_hit and cached.stats.cache_hit
+    assert stats.native_time >= stats.hgs_time * 0.5 > 0
+    assert stats.total_time >= stats.prepare_time + stats.native_time + stats.extract_time
+    # list input: node data plus the converted 17 x 17 matrix
+    assert stats.bytes_copied == 8 * (4 * 17 + 17 * 17)
+
+    assert Solver(quick_ap, verbose=False).solve_cvrp(or_tools_data).stats is None
+
+
+def test_trace_replaces_stdout(or_tools_data, capfd):
+    ap = AlgorithmParameters(nbIter=2000, nbIterTraces=200)
+    solver = Solver(ap, verbose=False, trace=True, instrument=True)
+    result = solver.solve_cvrp(or_tools_data)
+
+    assert capfd.readouterr().out == ""
+    trace = result.trace
+    assert trace.dtype == TRACE_DTYPE and trace.size >= 10
+    assert (np.diff(trace["iteration"]) == 200).all()
+    assert trace["feasible_best"][-1] == result.cost
+    assert result.stats.iterations >= trace["iteration"][-1]
+    assert result.stats.capacity_penalty == trace["capacity_penalty"][-1]
+
+
+def test_trace_gives_back_other_output(or_tools_data, capfd):
+    solver = Solver(AlgorithmParameters(timeLimit=1.0), verbose=False, trace=True)
+
+    def writer():
+        for i in range(10):
+            os.write(1, f"writer line {i}\n".encode())
+            time.sleep(0.05)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    result = solver.solve_cvrp(or_tools_data)
+    thread.join()
+
+    assert result.trace.size > 0
+    out = capfd.readouterr().out
+    assert out.splitlines() == [f"writer line {i}" for i in range(10)]
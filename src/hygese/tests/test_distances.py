@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from hygese import AlgorithmParameters, Solver
+from hygese.distances import distance_matrix, round_half_up
+
+
+def _points(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random(n) * 1000, rng.random(n) * 1000
+
+
+@pytest.mark.parametrize(
+    "metric, expected",
+    [
+        ("euclidean", lambda dx, dy: np.sqrt(dx**2 + dy**2)),
+        ("rounded_euclidean", lambda dx, dy: np.floor(np.sqrt(dx**2 + dy**2) + 0.5)),
+        ("manhattan", lambda dx, dy: np.abs(dx) + np.abs(dy)),
+    ],
+)
+def test_planar_metrics(metric, expected):
+    x, y = _points()
+    dx, dy = x[:, None] - x, y[:, None] - y
+    np.testing.assert_allclose(distance_matrix(x, y, metric), expected(dx, dy))
+
+
+def test_haversine():
+    # Paris -> London, about 343.5 km; negative longitudes are fine.
+    lon = np.array([2.3522, -0.1276])
+    lat = np.array([48.8566, 51.5072])
+    d = distance_matrix(lon, lat, "haversine")
+    assert d[0, 0] == 0 and d[0, 1] == d[1, 0]
+    assert d[0, 1] == pytest.approx(343.5e3, rel=1e-3)
+
+
+def test_blocked_and_threaded_match():
+    x, y = _points(n=301)
+    expected = distance_matrix(x, y, "manhattan")
+    out = np.empty_like(expected)
+    result = distance_matrix(x, y, "manhattan", workers=4, block_rows=7, out=out)
+    assert result is out
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_round_half_up_matches_c():
+    np.testing.assert_array_equal(round_half_up(np.array([0.5, 1.5, 2.5, 2.49])), [1, 2, 3, 2])
+
+
+def test_unknown_metric():
+    with pytest.raises(ValueError, match="Unknown metric"):
+        distance_matrix([0.0], [0.0], "chebyshev")
+
+
+def test_solve_with_metric_matches_hgs_rounding(quick_ap):
+    x, y = _points(n=20, seed=3)
+    demands = np.ones(20)
+    demands[0] = 0
+    data = {"x_coordinates": x, "y_coordinates": y, "demands": demands, "vehicle_capacity": 6}
+
+    solver = Solver(quick_ap, verbose=False)
+    assert solver.solve_cvrp(data, metric="rounded_euclidean").cost == solver.solve_cvrp(data).cost
+
+
+def test_solve_with_haversine():
+    lon = np.array([-0.1276, -0.0877, -0.1419, -0.0754, -0.1870])
+    lat = np.array([51.5072, 51.5055, 51.5014, 51.5081, 51.4980])
+    data = {"x_coordinates": lon, "y_coordinates": lat, "demands": [0, 1, 1, 1, 1], "vehicle_capacity": 2}
+
+    result = Solver(AlgorithmParameters(nbIter=200), verbose=False).solve_cvrp(data, metric="haversine")
+    assert sorted(n for r in result.routes for n in r) == [1, 2, 3, 4]
+    assert 1e3 < result.cost < 5e4
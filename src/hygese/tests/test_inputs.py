@@ -2,13 +2,13 @@
 
 Variant tests pin down the dtype / contiguity branches of np.ascontiguousarray
 in _solve_cvrp and _solve_cvrp_dist_mtx. Validation tests pin down the
-explicit ValueError / assertion guards in solve_cvrp.
+ValueError guards in CVRPInstance, which solve_cvrp builds from dict input.
 """
 
 import numpy as np
 import pytest
 
-from hygese import AlgorithmParameters, Solver
+from hygese import AlgorithmParameters, CVRPInstance, Solver
 
 
 # --- helpers ---------------------------------------------------------------
@@ -102,17 +102,123 @@ def test_invalid_depot_raises_value_error(or_tools_data, quick_ap):
         solver.solve_cvrp(or_tools_data)
 
 
-def test_mismatched_lengths_raises_assertion(or_tools_data, quick_ap):
-    """Coords explicitly shorter than demands must trip the length assertion."""
+def test_mismatched_lengths_raises_value_error(or_tools_data, quick_ap):
+    """Coords explicitly shorter than demands must trip the length check."""
     solver = Solver(quick_ap, verbose=False)
     or_tools_data["x_coordinates"] = [0.0, 1.0]
     or_tools_data["y_coordinates"] = [0.0, 1.0]
-    with pytest.raises(AssertionError):
+    with pytest.raises(ValueError, match="same length"):
         solver.solve_cvrp(or_tools_data)
 
 
-def test_negative_demand_raises_assertion(or_tools_data, quick_ap):
+def test_negative_demand_raises_value_error(or_tools_data, quick_ap):
     solver = Solver(quick_ap, verbose=False)
     or_tools_data["demands"][1] = -1
-    with pytest.raises(AssertionError):
+    with pytest.raises(ValueError, match="demands must be non-negative"):
         solver.solve_cvrp(or_tools_data)
+
+
+def test_negative_distance_raises_value_error(or_tools_data, quick_ap):
+    solver = Solver(quick_ap, verbose=False)
+    or_tools_data["distance_matrix"][3][4] = -1
+    with pytest.raises(ValueError, match="distance_matrix must be non-negative"):
+        solver.solve_cvrp(or_tools_data)
+
+
+def test_missing_distances_raises_value_error(quick_ap):
+    with pytest.raises(ValueError, match="distance_matrix is required"):
+        Solver(quick_ap, verbose=False).solve_cvrp({"demands": [0, 1], "vehicle_capacity": 1})
+
+
+# --- pre-validated instances -----------------------------------------------
+
+
+def test_instance_matches_dict(or_tools_data, quick_ap):
+    solver = Solver(quick_ap, verbose=False)
+    instance = CVRPInstance.from_data(or_tools_data)
+
+    assert instance.distance_matrix.flags["C_CONTIGUOUS"]
+    assert instance.demands.dtype == np.float64
+    assert solver.solve_cvrp(instance).cost == solver.solve_cvrp(or_tools_data).cost
+
+
+def test_instance_skips_validation(or_tools_data, quick_ap, monkeypatch):
+    """Solving a CVRPInstance must not re-validate or re-convert its data."""
+    import hygese.hygese as _hg
+
+    instance = CVRPInstance(
+        or_tools_data["demands"],
+        or_tools_data["vehicle_capacity"],
+        distance_matrix=or_tools_data["distance_matrix"],
+        num_vehicles=4,
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("validation ran again")
+
+    monkeypatch.setattr(_hg, "_prepare_distance_matrix", fail)
+    monkeypatch.setattr(_hg.CVRPInstance, "from_data", fail)
+    result = Solver(quick_ap, verbose=False).solve_cvrp(instance)
+    assert result.n_routes <= 4
+
+
+# --- sparse distances ------------------------------------------------------
+
+
+def _knn(dist, k):
+    idx = np.argsort(dist, axis=1)[:, 1 : k + 1]
+    return idx, np.take_along_axis(dist, idx, axis=1)
+
+
+def test_neighbor_lists_with_coordinate_fallback(quick_ap):
+    """kNN lists whose missing pairs fall back to rounded Euclidean distances
+    describe the same instance as the coordinates alone."""
+    solver = Solver(quick_ap, verbose=False)
+    data = _tiny_coord_data()
+    x, y = np.asarray(data["x_coordinates"]), np.asarray(data["y_coordinates"])
+    dist = np.round(np.hypot(x[:, None] - x, y[:, None] - y))
+
+    idx, nd = _knn(dist, k=2)
+    sparse = {**data, "neighbor_indices": idx, "neighbor_distances": nd}
+
+    assert solver.solve_cvrp(sparse).cost == solver.solve_cvrp(data).cost
+
+
+def test_neighbor_lists_with_scalar_fallback(or_tools_data, quick_ap):
+    solver = Solver(quick_ap, verbose=False)
+    dist = np.asarray(or_tools_data.pop("distance_matrix"), dtype=np.float64)
+
+    idx, nd = _knn(dist, k=len(dist) - 1)
+    data = {**or_tools_data, "neighbor_indices": idx, "neighbor_distances": nd, "missing_distance": 1e6}
+    assert solver.solve_cvrp(data).cost == solver.solve_cvrp({**or_tools_data, "distance_matrix": dist}).cost
+
+
+def test_neighbor_lists_need_a_fallback(or_tools_data, quick_ap):
+    dist = np.asarray(or_tools_data.pop("distance_matrix"), dtype=np.float64)
+    idx, nd = _knn(dist, k=3)
+    data = {**or_tools_data, "neighbor_indices": idx, "neighbor_distances": nd}
+    with pytest.raises(ValueError, match="missing_distance"):
+        Solver(quick_ap, verbose=False).solve_cvrp(data)
+
+
+def test_scipy_sparse_distance_matrix(or_tools_data, quick_ap):
+    sp = pytest.importorskip("scipy.sparse")
+    solver = Solver(quick_ap, verbose=False)
+    dense = np.asarray(or_tools_data["distance_matrix"], dtype=np.float64)
+
+    data = {**or_tools_data, "distance_matrix": sp.csr_matrix(dense), "missing_distance": 0.0}
+    assert solver.solve_cvrp(data).cost == solver.solve_cvrp(or_tools_data).cost
+
+
+def test_memmap_distance_matrices(or_tools_data, quick_ap, tmp_path):
+    """float64 and float32 .npy files opened with mmap_mode give the same
+    cost as the in-memory matrix."""
+    solver = Solver(quick_ap, verbose=False)
+    dense = np.asarray(or_tools_data["distance_matrix"], dtype=np.float64)
+    expected = solver.solve_cvrp(or_tools_data).cost
+
+    for dtype in (np.float64, np.float32):
+        path = tmp_path / f"dist_{np.dtype(dtype).name}.npy"
+        np.save(path, dense.astype(dtype))
+        data = {**or_tools_data, "distance_matrix": np.load(path, mmap_mode="r")}
+        assert solver.solve_cvrp(data).cost == expected
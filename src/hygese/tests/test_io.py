@@ -0,0 +1,106 @@
+import gzip
+import io
+import tarfile
+
+import numpy as np
+import pytest
+
+from hygese import Solver, bench
+from hygese.io import iter_instances, read_instance, read_solution, write_instance, write_solution
+
+
+def test_read_bundled_instances():
+    instances = {inst.name: inst for inst in iter_instances(bench.INSTANCES_DIR)}
+
+    inst = instances["E-n22-k4"]
+    assert inst.rounding and inst.best_known == 375
+    assert inst.specs["EDGE_WEIGHT_TYPE"] == "EUC_2D"
+    assert inst.data["demands"].dtype == np.float64
+    assert inst.data["demands"][0] == 0
+
+    inst = instances["ORTools-n17-k4"]
+    assert inst.data["distance_matrix"].shape == (17, 17)
+    assert np.allclose(inst.data["distance_matrix"], inst.data["distance_matrix"].T)
+
+
+@pytest.mark.parametrize(
+    "fmt, take",
+    [
+        ("UPPER_ROW", lambda m: m[np.triu_indices(4, 1)]),
+        ("LOWER_ROW", lambda m: m[np.tril_indices(4, -1)]),
+        ("UPPER_DIAG_ROW", lambda m: m[np.triu_indices(4)]),
+        ("LOWER_DIAG_ROW", lambda m: m[np.tril_indices(4)]),
+        ("UPPER_COL", lambda m: m.T[np.tril_indices(4, -1)[::-1]]),
+    ],
+)
+def test_explicit_formats(fmt, take):
+    rng = np.random.default_rng(0)
+    matrix = rng.integers(1, 100, (4, 4)).astype(float)
+    matrix = np.triu(matrix, 1) + np.triu(matrix, 1).T
+    text = (
+        f"NAME : t\nTYPE : TSP\nDIMENSION : 4\nEDGE_WEIGHT_TYPE : EXPLICIT\n"
+        f"EDGE_WEIGHT_FORMAT : {fmt}\nEDGE_WEIGHT_SECTION\n"
+        + " ".join(f"{v:g}" for v in take(matrix))
+        + "\nEOF\n"
+    )
+    inst = read_instance(text.encode())
+    assert np.array_equal(inst.data["distance_matrix"], matrix)
+    assert "demands" not in inst.data
+
+
+def test_att_and_geo_weights():
+    # ATT: sqrt((4501**2 + 1443**2) / 10) = 1494.7, rounded up.
+    att = read_instance(
+        b"NAME : a\nTYPE : TSP\nDIMENSION : 2\nEDGE_WEIGHT_TYPE : ATT\n"
+        b"NODE_COORD_SECTION\n1 6734 1453\n2 2233 10\nEOF\n"
+    )
+    assert att.data["distance_matrix"][0, 1] == 1495
+
+    geo = read_instance(
+        b"NAME : g\nTYPE : TSP\nDIMENSION : 2\nEDGE_WEIGHT_TYPE : GEO\n"
+        b"NODE_COORD_SECTION\n1 -14.4 -71.4\n2 0.0 0.0\nEOF\n"
+    )
+    d = geo.data["distance_matrix"]
+    assert d[0, 1] == d[1, 0] > 0 and d[0, 0] == 0
+    assert geo.data["x_coordinates"].min() == 0
+
+
+def test_write_read_round_trip(tmp_path, or_tools_data):
+    data = dict(or_tools_data, service_times=np.arange(17.0), duration_limit=5000)
+    path = tmp_path / "ort.vrp"
+    write_instance(path, data, name="ort", comment="Optimal value: 6208")
+
+    inst = read_instance(str(path))
+    assert inst.name == "ort" and inst.best_known == 6208
+    assert np.array_equal(inst.data["distance_matrix"], np.asarray(data["distance_matrix"]))
+    assert np.array_equal(inst.data["demands"], np.asarray(data["demands"]))
+    assert np.array_equal(inst.data["service_times"], data["service_times"])
+    assert inst.data["vehicle_capacity"] == 15
+    assert inst.data["num_vehicles"] == 4
+    assert inst.data["duration_limit"] == 5000
+
+
+def test_iter_tar_archive(tmp_path):
+    archive = tmp_path / "set.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        for path in bench.bundled_instances():
+            with open(path, "rb") as f:
+                raw = f.read()
+            name = path.rsplit("/", 1)[-1]
+            info = tarfile.TarInfo(f"set/{name}.gz")
+            payload = gzip.compress(raw)
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+
+    names = [inst.name for inst in iter_instances(str(archive))]
+    assert sorted(names) == ["E-n22-k4", "ORTools-n17-k4"]
+
+
+def test_solution_round_trip(tmp_path, or_tools_data, quick_ap):
+    result = Solver(quick_ap, verbose=False).solve_cvrp(or_tools_data, rounding=False)
+    path = tmp_path / "ort.sol"
+    write_solution(path, result)
+
+    routes, cost = read_solution(str(path))
+    assert routes == [list(r) for r in result.routes]
+    assert cost == result.cost
@@ -0,0 +1,38 @@
+import logging
+
+from hygese.metrics import LoggingMetrics, OpenTelemetryMetrics, SolveStats
+
+STATS = SolveStats(
+    n_nodes=17, prepare_time=0.01, native_time=0.5, total_time=0.52, hgs_time=0.49, bytes_copied=64
+)
+
+
+def test_logging_metrics(caplog):
+    with caplog.at_level(logging.INFO, logger="hygese"):
+        LoggingMetrics()(STATS)
+    (record,) = caplog.records
+    assert "n_nodes=17" in record.getMessage()
+    assert record.hygese["overhead"] == STATS.overhead
+
+
+class _Histogram:
+    def __init__(self):
+        self.points = []
+
+    def record(self, value, attributes=None):
+        self.points.append((value, attributes))
+
+
+class _Meter:
+    def __init__(self):
+        self.histograms = {}
+
+    def create_histogram(self, name, unit="", description=""):
+        return self.histograms.setdefault(name, _Histogram())
+
+
+def test_opentelemetry_metrics():
+    meter = _Meter()
+    OpenTelemetryMetrics(meter)(STATS)
+    assert meter.histograms["hygese.solve.native_time"].points == [(0.5, {"cache_hit": False})]
+    assert meter.histograms["hygese.solve.bytes_copied"].points[0][0] == 64
@@ -0,0 +1,84 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+
+from hygese import AlgorithmParameters, Solver
+from hygese.pool import SolverPool, WorkerCrashedError
+
+
+def test_pool_matches_solver(or_tools_data, quick_ap):
+    expected = Solver(quick_ap, verbose=False).solve_cvrp(or_tools_data)
+
+    coords = dict(or_tools_data)
+    del coords["distance_matrix"]
+    rng = np.random.default_rng(0)
+    coords["x_coordinates"] = rng.uniform(0, 100, 17)
+    coords["y_coordinates"] = rng.uniform(0, 100, 17)
+
+    with SolverPool(quick_ap, workers=2) as pool:
+        results = list(pool.map([or_tools_data, coords, or_tools_data]))
+    assert results[0].cost == results[2].cost == expected.cost
+    assert sorted(c for route in results[1].routes for c in route) == list(range(1, 17))
+
+
+def test_pool_workers_are_not_forked(quick_ap):
+    with SolverPool(quick_ap, workers=1) as pool:
+        assert pool._context.get_start_method() in ("forkserver", "spawn")
+
+
+def test_pool_traces_and_stats(or_tools_data):
+    ap = AlgorithmParameters(nbIter=500, nbIterTraces=100)
+    with SolverPool(ap, workers=1, trace=True, instrument=True) as pool:
+        result = pool.submit(or_tools_data).result()
+    assert result.trace.size > 0 and result.stats.iterations is not None
+
+
+def test_pool_invalid_input_raises_on_submit(or_tools_data, quick_ap):
+    or_tools_data["depot"] = 1
+    with SolverPool(quick_ap, workers=1) as pool:
+        with pytest.raises(ValueError, match="depot location must be 0"):
+            pool.submit(or_tools_data)
+
+
+def test_pool_timeout_and_crash_replace_worker(or_tools_data, quick_ap):
+    slow = AlgorithmParameters(timeLimit=60.0)
+    with SolverPool(quick_ap, workers=1) as pool:
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            pool.submit(or_tools_data, timeout=0.5, parameters=slow).result()
+        assert time.perf_counter() - start < 10.0
+
+        future = pool.submit(or_tools_data, parameters=slow)
+        time.sleep(1.0)
+        for child in multiprocessing.active_children():
+            child.kill()
+        with pytest.raises(WorkerCrashedError):
+            future.result()
+
+        assert pool.submit(or_tools_data).result().cost > 0
+
+
+def test_pool_kills_solve_past_time_limit():
+    # Building the first solution of 2000 nodes overshoots a 0.1 s timeLimit.
+    rng = np.random.default_rng(0)
+    n = 2000
+    data = {
+        "x_coordinates": rng.uniform(0, 1000, n),
+        "y_coordinates": rng.uniform(0, 1000, n),
+        "demands": np.r_[0, np.ones(n - 1)],
+        "vehicle_capacity": 50,
+    }
+    with SolverPool(AlgorithmParameters(timeLimit=0.1), workers=1, kill_grace=0.2) as pool:
+        with pytest.raises(TimeoutError):
+            pool.submit(data).result()
+
+
+def test_pool_retries_crashed_solve(or_tools_data):
+    with SolverPool(AlgorithmParameters(timeLimit=2.0), workers=1, retries=1) as pool:
+        future = pool.submit(or_tools_data)
+        time.sleep(1.0)
+        for child in multiprocessing.active_children():
+            child.kill()
+        assert future.result().cost > 0
@@ -1,4 +1,7 @@
+import numpy as np
+
 from hygese import AlgorithmParameters, Solver
+from hygese._routes import TourMetric, polish_tour
 # import random
 # import elkai
 # import numpy as np
@@ -31,6 +34,30 @@ def test_tsp():
     print(result.routes)
 
     assert (result.cost == 7293)
+    assert set(data) == {'distance_matrix'}  # input left untouched
+    assert result.tour[0] == 0 and sorted(result.tour) == list(range(13))
+
+
+def test_tsp_coordinates_tour():
+    rng = np.random.default_rng(0)
+    data = {'x_coordinates': rng.uniform(0, 1000, 60), 'y_coordinates': rng.uniform(0, 1000, 60)}
+    result = Solver(AlgorithmParameters(nbIter=200), verbose=False).solve_tsp(data)
+
+    metric = TourMetric(x_coords=data['x_coordinates'], y_coords=data['y_coordinates'], rounding=True)
+    assert result.tour.dtype == np.int32
+    assert result.cost == metric.legs(result.tour).sum()
+    assert result.routes[0] == result.tour[1:].tolist()
+
+
+def test_polish_tour_improves_random_tour():
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(0, 1000, 100), rng.uniform(0, 1000, 100)
+    metric = TourMetric(x_coords=x, y_coords=y)
+    tour = np.concatenate(([0], rng.permutation(np.arange(1, 100))))
+
+    polished = polish_tour(tour, metric)
+    assert polished[0] == 0 and sorted(polished) == list(range(100))
+    assert metric.legs(polished).sum() < 0.5 * metric.legs(tour).sum()
 
 # elkai not working in python 3.10
 # def test_elkai():
@@ -0,0 +1,44 @@
+import numpy as np
+
+from hygese import AlgorithmParameters, Solver
+from hygese.tune import ParameterPresets, sample_candidates, tune, tune_presets
+
+
+def test_presets_select_and_roundtrip(tmp_path):
+    small = AlgorithmParameters(mu=10, timeLimit=0.1)
+    large = AlgorithmParameters(mu=40, timeLimit=1.0)
+    presets = ParameterPresets([(100, small), (1000, large)])
+    assert presets.select(50) == small
+    assert presets.select(100) == small
+    assert presets.select(5000) == large
+
+    path = tmp_path / "presets.json"
+    presets.save(path)
+    assert ParameterPresets.load(path) == presets
+
+
+def test_solver_uses_preset_for_instance_size(or_tools_data):
+    presets = ParameterPresets(
+        [(10, AlgorithmParameters(nbIterTraces=50)), (20, AlgorithmParameters(nbIterTraces=300))]
+    )
+    solver = Solver(verbose=False, trace=True, presets=presets)
+    trace = solver.solve_cvrp(or_tools_data).trace
+    assert (np.diff(trace["iteration"]) == 300).all()
+
+
+def test_tune_halves_candidates(or_tools_data):
+    candidates = sample_candidates(4, seed=1)
+    assert candidates[0] == AlgorithmParameters() and len(set(map(repr, candidates))) == 4
+
+    result = tune([or_tools_data], 0.1, candidates=candidates, max_rounds=2, workers=1)
+    runs = sorted(r for _, _, r in result.scores)
+    assert runs == [1, 1, 3, 3]  # two survivors got 2 more seeds
+    assert result.best.timeLimit == 0.1
+    assert result.best in [p for p, _, _ in result.scores[:2]]
+
+
+def test_tune_presets_buckets(or_tools_data):
+    presets = tune_presets(
+        [or_tools_data], 0.1, bounds=(10, 100), candidates=2, max_rounds=1, workers=1
+    )
+    assert [m for m, _ in presets.buckets] == [100]
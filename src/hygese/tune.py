@@ -0,0 +1,261 @@
+"""Tune ``AlgorithmParameters`` for a solve-time budget.
+
+``tune`` races random parameter candidates on representative instances with
+successive halving: every round runs the surviving candidates on all
+instances with new seeds, ranks them by their mean cost relative to the
+best cost found on each instance, and keeps the best ``1 / eta`` of them.
+``tune_presets`` does this per instance-size bucket and returns
+``ParameterPresets``, which ``Solver(presets=...)`` consults at solve time::
+
+    presets = tune_presets(instances, time_limit=0.5, bounds=(100, 500))
+    presets.save("presets.json")
+    solver = Solver(presets=ParameterPresets.load("presets.json"))
+
+or from the command line, on CVRPLIB files::
+
+    python -m hygese.tune instances/ --time-limit 0.5 --buckets 100 500 --output presets.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from dataclasses import asdict, dataclass, field, replace
+
+import numpy as np
+
+from .hygese import AlgorithmParameters, CVRPInstance, Solver
+
+# Values tried for each tuned field; candidates combine them at random.
+SEARCH_SPACE = {
+    "nbGranular": (10, 15, 20, 30, 40),
+    "mu": (10, 15, 25, 40, 60),
+    "lambda_": (10, 20, 40, 60, 80),
+    "nbElite": (2, 4, 6, 8),
+    "nbClose": (3, 5, 8),
+    "targetFeasible": (0.1, 0.2, 0.3, 0.4),
+    "nbIterPenaltyManagement": (50, 100, 200),
+    "useSwapStar": (True, False),
+}
+
+
+@dataclass
+class TuningResult:
+    """Outcome of ``tune``.
+
+    ``scores`` lists ``(parameters, score, runs)`` for every candidate, best
+    first; ``score`` is the candidate's mean cost divided by the best cost
+    found on the same instance, over its ``runs`` solves.
+    """
+
+    best: AlgorithmParameters
+    scores: list = field(default_factory=list)
+
+
+@dataclass
+class ParameterPresets:
+    """``AlgorithmParameters`` by instance size.
+
+    ``buckets`` is a list of ``(max_nodes, parameters)`` sorted by
+    ``max_nodes``: an instance with n nodes uses the first bucket with
+    ``n <= max_nodes``, and the last bucket serves larger instances too.
+    """
+
+    buckets: list
+
+    def select(self, n_nodes):
+        for max_nodes, parameters in self.buckets:
+            if n_nodes <= max_nodes:
+                return parameters
+        return self.buckets[-1][1]
+
+    def to_json(self):
+        return json.dumps(
+            [{"max_nodes": m, "parameters": asdict(p)} for m, p in self.buckets], indent=2
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(
+            [(b["max_nodes"], AlgorithmParameters(**b["parameters"])) for b in json.loads(text)]
+        )
+
+    def save(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_json())
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_json(f.read())
+
+
+def sample_candidates(n, base=None, seed=0):
+    """``base`` (default ``AlgorithmParameters()``) followed by ``n - 1``
+    distinct random variations of it drawn from ``SEARCH_SPACE``."""
+    base = base or AlgorithmParameters()
+    rng = np.random.default_rng(seed)
+    candidates = [base]
+    seen = {tuple(asdict(base).items())}
+    for _ in range(100 * n):
+        if len(candidates) >= n:
+            break
+        changes = {name: values[rng.integers(len(values))] for name, values in SEARCH_SPACE.items()}
+        candidate = replace(base, **changes)
+        key = tuple(asdict(candidate).items())
+        if key not in seen:
+            seen.add(key)
+            candidates.append(candidate)
+    return candidates
+
+
+def tune(
+    instances,
+    time_limit,
+    candidates=16,
+    eta=2,
+    max_rounds=4,
+    budget=None,
+    base=None,
+    workers=None,
+    executor="process",
+    rounding=True,
+    seed=0,
+):
+    """Pick the ``AlgorithmParameters`` that do best within ``time_limit``.
+
+    ``instances`` are ``data`` dicts or ``CVRPInstance``s; every solve runs
+    with ``timeLimit=time_limit``. ``candidates`` is a count (sampled by
+    ``sample_candidates`` around ``base``) or a list of parameters. Round r
+    solves each survivor on every instance with ``2**r`` new seeds, in
+    parallel (see ``Solver.iter_solve_many`` for ``workers`` and
+    ``executor``; the process executor keeps the ``timeLimit`` of
+    concurrent solves apart where HGS measures it in process CPU time). Halving stops after ``max_rounds``, once one
+    candidate is left, or when ``budget`` wall-clock seconds would be
+    exceeded by the next round. Returns a ``TuningResult``.
+    """
+    start = time.perf_counter()
+    instances = [
+        data if isinstance(data, CVRPInstance) else CVRPInstance.from_data(data, rounding=rounding)
+        for data in instances
+    ]
+    if isinstance(candidates, int):
+        candidates = sample_candidates(candidates, base=base, seed=seed)
+    candidates = [replace(p, timeLimit=time_limit) for p in candidates]
+
+    costs = [[] for _ in candidates]  # per candidate: (instance index, cost)
+    best_cost = np.full(len(instances), np.inf)
+    alive = list(range(len(candidates)))
+    solver = Solver(candidates[0], verbose=False)
+    next_seed = 0
+
+    for r in range(max_rounds):
+        seeds = range(next_seed, next_seed + 2**r)
+        tasks, owners = [], []
+        for c in alive:
+            for s in seeds:
+                for i, instance in enumerate(instances):
+                    tasks.append((instance, rounding, replace(candidates[c], seed=s)))
+                    owners.append((c, i))
+
+        round_start = time.perf_counter()
+        for k, result in solver._iter_solve_tasks(tasks, workers, executor):
+            c, i = owners[k]
+            cost = np.inf if isinstance(result, Exception) else result.cost
+            costs[c].append((i, cost))
+            best_cost[i] = min(best_cost[i], cost)
+        next_seed += 2**r
+
+        scores = {c: _score(costs[c], best_cost) for c in alive}
+        alive.sort(key=scores.get)
+        if len(alive) == 1:
+            break
+        alive = alive[: max(1, math.ceil(len(alive) / eta))]
+
+        # the next round runs fewer candidates on twice as many seeds
+        round_time = time.perf_counter() - round_start
+        projected = round_time * 2 * len(alive) / len(scores)
+        if budget is not None and time.perf_counter() - start + projected > budget:
+            break
+
+    ranked = sorted(
+        (_score(costs[c], best_cost), c) for c in range(len(candidates)) if costs[c]
+    )
+    scores = [(candidates[c], score, len(costs[c])) for score, c in ranked]
+    return TuningResult(best=candidates[alive[0]], scores=scores)
+
+
+def tune_presets(instances, time_limit, bounds=(100, 500, 2000), **kwargs):
+    """Run ``tune`` separately on the instances of each size bucket.
+
+    Bucket k holds instances with ``bounds[k-1] < n <= bounds[k]``, plus a
+    last bucket for anything larger; empty buckets are skipped. ``kwargs``
+    go to ``tune``, so a ``budget`` applies to each bucket. Returns
+    ``ParameterPresets``.
+    """
+    rounding = kwargs.get("rounding", True)
+    instances = [
+        data if isinstance(data, CVRPInstance) else CVRPInstance.from_data(data, rounding=rounding)
+        for data in instances
+    ]
+    limits = list(bounds) + [math.inf]
+    buckets = []
+    lower = 0
+    for upper in limits:
+        group = [inst for inst in instances if lower < inst.n_nodes <= upper]
+        if group:
+            best = tune(group, time_limit, **kwargs).best
+            max_nodes = upper if upper != math.inf else max(inst.n_nodes for inst in group)
+            buckets.append((max_nodes, best))
+        lower = upper
+    if not buckets:
+        raise ValueError("No instances to tune on.")
+    return ParameterPresets(buckets)
+
+
+def _score(runs, best_cost):
+    return float(np.mean([cost / best_cost[i] for i, cost in runs]))
+
+
+def main(argv=None):
+    from .bench import _load
+
+    parser = argparse.ArgumentParser(prog="python -m hygese.tune", description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help=".vrp files, directories or tar archives (default: bundled set)")
+    parser.add_argument("--time-limit", type=float, required=True, help="timeLimit per solve, seconds")
+    parser.add_argument("--candidates", type=int, default=16)
+    parser.add_argument("--eta", type=int, default=2)
+    parser.add_argument("--max-rounds", type=int, default=4)
+    parser.add_argument("--budget", type=float, help="total tuning time in seconds")
+    parser.add_argument("--buckets", type=int, nargs="*", default=[], help="size bucket bounds")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the presets to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    instances = [
+        CVRPInstance.from_data(instance.data, rounding=instance.rounding)
+        for instance in _load(args.paths)
+    ]
+
+    presets = tune_presets(
+        instances,
+        args.time_limit,
+        bounds=args.buckets,
+        candidates=args.candidates,
+        eta=args.eta,
+        max_rounds=args.max_rounds,
+        budget=args.budget,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    if args.output:
+        presets.save(args.output)
+    else:
+        sys.stdout.write(presets.to_json() + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())